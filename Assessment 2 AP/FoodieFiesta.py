@@ -11,13 +11,1264 @@ from PIL import Image, ImageTk # Import the PIL library for image processing
 import requests # Import the requests library for API calls
 from io import BytesIO # Import the BytesIO library for image data
 from tkinter import messagebox  # Import the messagebox library for displaying messages
+import argparse # Import the argparse library for the command line tools
+import hashlib # Import the hashlib library for cache file names
+import heapq # Import the heapq library for the request priority queue
+import json # Import the json library for the local meal catalog
+import mimetypes # Import the mimetypes library for cache daemon responses
+import mmap # Import the mmap library for the packed thumbnail store
+import os # Import the os library for cache file paths
+import queue # Import the queue library for passing results between threads
+import string # Import the string library for the catalog letters
+import struct # Import the struct library for thumbnail record headers
+import sys # Import the sys library for command line arguments
+import threading # Import the threading library for background requests
+import time # Import the time library for timing queries
+import zlib # Import the zlib library for thumbnail checksums
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed # Import futures for background work
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer # Import the HTTP server for the cache daemon
+from urllib.parse import parse_qs, quote, urlparse # Import URL helpers for cache invalidation
+
+# Base URL of TheMealDB API (free test key)
+API_BASE = "https://www.themealdb.com/api/json/v1/1"
+# Folder where locally cached data is stored, next to this script
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache")
+# How long cached API responses stay fresh, in seconds
+JSON_CACHE_TTL = 24 * 60 * 60
+# Requests per second sent to TheMealDB directly, and to a local cache daemon
+DIRECT_RATE = 10.0
+DAEMON_RATE = 100.0
+# Request priorities, lowest number is sent first
+PRIORITY_USER = 0 # user-initiated searches and meal details
+PRIORITY_VISIBLE = 1 # thumbnails currently on screen
+PRIORITY_PREFETCH = 2 # cache warming and catalog downloads
+# Number of recently viewed meals remembered and pinned in the cache
+RECENT_LIMIT = 20
+# Shared cache daemon used instead of TheMealDB when it is running.
+# Set FOODIE_CACHE_DAEMON to another address for a daemon on the LAN, or to
+# an empty string to always talk to TheMealDB directly.
+DAEMON_URL = os.environ.get("FOODIE_CACHE_DAEMON", "http://127.0.0.1:8765")
+# Only TheMealDB URLs are fetched by the cache daemon
+# Seconds between checks for a daemon that was not answering
+DAEMON_RECHECK = 60
+DAEMON_UPSTREAM = "https://www.themealdb.com/"
+
+
+def meal_ingredients(meal):
+    #Return the normalised ingredient names of a meal (lookup.php payload).
+    names = []
+    for i in range(1, 21):
+        ingredient = meal.get(f"strIngredient{i}")
+        if ingredient and ingredient.strip():
+            name = " ".join(ingredient.lower().split())
+            if name not in names:
+                names.append(name)
+    return names
+
+
+class MealCatalog:
+    # Local store of full meal details (the lookup.php payload) keyed by idMeal.
+    # Saved as a single JSON file so the pantry tab works without the network.
+    # Changed by the GUI and by the background catalog sync, so changes and
+    # saves hold a lock.
+
+    def __init__(self, path):
+        self.path = path
+        self.meals = {}
+        self.times = {} # idMeal -> time the details were stored
+        # Bumped on every change so dependent indexes know when to rebuild
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.save_lock = threading.Lock() # one writer of the temporary file at a time
+        self.load()
+
+    def load(self):
+        #Load the catalog from disk, starting empty if the file is missing or broken.
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            self.meals = data["meals"]
+            self.times = data["times"]
+        except (OSError, ValueError, KeyError, TypeError):
+            self.meals = {}
+            self.times = {}
+        self.version += 1
+
+    def save(self):
+        #Write the catalog to disk atomically.
+        # Encode a snapshot so other threads can keep changing the catalog
+        with self.lock:
+            data = {"meals": dict(self.meals), "times": dict(self.times)}
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with self.save_lock:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+
+    def add(self, meal):
+        #Add or update a meal. Returns True if the catalog changed.
+        if not meal or not meal.get("idMeal"):
+            return False
+        with self.lock:
+            if self.meals.get(meal["idMeal"]) == meal:
+                return False
+            self.meals[meal["idMeal"]] = meal
+            self.times[meal["idMeal"]] = time.time()
+            self.version += 1
+        return True
+
+    def remove(self, meal_ids):
+        #Remove meals from the catalog. Returns how many were removed.
+        removed = 0
+        with self.lock:
+            for meal_id in meal_ids:
+                if self.meals.pop(str(meal_id), None) is not None:
+                    removed += 1
+                self.times.pop(str(meal_id), None)
+            if removed:
+                self.version += 1
+        return removed
+
+    def stats(self):
+        #Return entry count, bytes on disk and entry ages for the details tier.
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            size = 0
+        with self.lock:
+            times = list(self.times.values())
+        now = time.time()
+        return {"entries": len(times),
+                "bytes": size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "ages": age_buckets(now - t for t in times)}
+
+    def get(self, meal_id):
+        return self.meals.get(str(meal_id))
+
+    def snapshot(self):
+        #Return a copy of the meals dict that is safe to iterate on any thread.
+        with self.lock:
+            return dict(self.meals)
+
+    def __len__(self):
+        return len(self.meals)
+
+
+def age_buckets(ages):
+    #Group entry ages (in seconds) into a small histogram.
+    buckets = {"< 1 hour": 0, "< 1 day": 0, "< 1 week": 0, "older": 0}
+    for age in ages:
+        if age < 60 * 60:
+            buckets["< 1 hour"] += 1
+        elif age < 24 * 60 * 60:
+            buckets["< 1 day"] += 1
+        elif age < 7 * 24 * 60 * 60:
+            buckets["< 1 week"] += 1
+        else:
+            buckets["older"] += 1
+    return buckets
+
+
+class DiskCache:
+    # One cache tier on disk: a file per entry plus an append-only index log.
+    # The log is replayed on startup and rewritten by compact().
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.index_path = os.path.join(directory, "index.jsonl")
+        self.entries = {} # key -> {"file", "size", "time"}
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        #Replay the index log to rebuild the in-memory entry table.
+        self.entries = {}
+        try:
+            with open(self.index_path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # Skip a line cut short by a crash
+                        continue
+                    if record.get("op") == "put":
+                        self.entries[record["key"]] = {"file": record["file"],
+                                                       "size": record["size"],
+                                                       "time": record["time"]}
+                    elif record.get("op") == "del":
+                        self.entries.pop(record["key"], None)
+        except OSError:
+            pass
+
+    def _log(self, records):
+        #Append records to the index log. Caller holds the lock.
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.index_path, "a", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+
+    def get(self, key, max_age=None, count=True):
+        #Return the cached bytes for key, or None on a miss or stale entry.
+        #count=False reads without touching the hit/miss counters.
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry and (max_age is None or time.time() - entry["time"] <= max_age):
+                try:
+                    with open(os.path.join(self.directory, entry["file"]), "rb") as f:
+                        data = f.read()
+                    if count:
+                        self.hits += 1
+                    return data
+                except OSError:
+                    # File went missing behind our back, forget the entry
+                    self.entries.pop(key, None)
+            if count:
+                self.misses += 1
+            return None
+
+    def put(self, key, data):
+        #Store bytes under key.
+        name = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        with self.lock:
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, name)
+            with open(path + ".tmp", "wb") as f:
+                f.write(data)
+            os.replace(path + ".tmp", path)
+            entry = {"file": name, "size": len(data), "time": time.time()}
+            self.entries[key] = entry
+            self._log([dict(entry, op="put", key=key)])
+
+    def keys(self):
+        with self.lock:
+            return list(self.entries)
+
+    def invalidate(self, predicate):
+        #Delete every entry whose key matches predicate. Returns the count.
+        with self.lock:
+            keys = [key for key in self.entries if predicate(key)]
+            for key in keys:
+                entry = self.entries.pop(key)
+                try:
+                    os.remove(os.path.join(self.directory, entry["file"]))
+                except OSError:
+                    pass
+            if keys:
+                self._log([{"op": "del", "key": key} for key in keys])
+            return len(keys)
+
+    def stats(self):
+        #Return entry count, bytes used, hit/miss counters and entry ages.
+        with self.lock:
+            now = time.time()
+            return {"entries": len(self.entries),
+                    "bytes": sum(entry["size"] for entry in self.entries.values()),
+                    "hits": self.hits,
+                    "misses": self.misses,
+                    "ages": age_buckets(now - entry["time"] for entry in self.entries.values())}
+
+    def compact(self, max_age=None):
+        #Rewrite the index log with live entries only and delete orphan files.
+        #Entries older than max_age (seconds) are dropped as well.
+        #Returns the number of files removed and bytes freed.
+        removed = 0
+        freed = 0
+        with self.lock:
+            if max_age is not None:
+                now = time.time()
+                for key in [k for k, e in self.entries.items() if now - e["time"] > max_age]:
+                    del self.entries[key]
+            live = {entry["file"] for entry in self.entries.values()}
+            try:
+                names = os.listdir(self.directory)
+            except OSError:
+                names = []
+            for name in names:
+                if name in live or name == os.path.basename(self.index_path):
+                    continue
+                path = os.path.join(self.directory, name)
+                try:
+                    freed += os.path.getsize(path)
+                    os.remove(path)
+                    removed += 1
+                except OSError:
+                    pass
+            if names:
+                tmp_path = self.index_path + ".tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    for key, entry in self.entries.items():
+                        f.write(json.dumps(dict(entry, op="put", key=key)) + "\n")
+                os.replace(tmp_path, self.index_path)
+        return {"files_removed": removed, "bytes_freed": freed}
+
+
+class ThumbnailPack:
+    # Packed thumbnail store: one append-only data file of raw pixels plus an
+    # index log mapping "url@WxH" keys to offset and length. The data file is
+    # read through mmap, so a cached thumbnail goes straight into
+    # Image.frombuffer without a file open or a copy.
+    # Pixels are stored as RGBX or RGBA: Pillow only shares memory with the
+    # buffer for 4-byte modes and would silently copy 3-byte RGB.
+    # Each record starts with a small header (magic, CRC32, length, size, mode)
+    # so the pack can be checked and compacted on its own.
+
+    HEADER = struct.Struct("<4sIIHH4s")
+    MAGIC = b"FFTP"
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.data_path = os.path.join(directory, "thumbnails.pack")
+        self.index_path = os.path.join(directory, "thumbnails.idx")
+        self.entries = {} # key -> {"offset", "length", "size", "mode", "crc", "time"}
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.map = None
+        self.load()
+
+    def load(self):
+        #Replay the index log and drop entries that point past the end of the pack.
+        self.entries = {}
+        try:
+            with open(self.index_path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # Skip a line cut short by a crash
+                        continue
+                    if record.get("op") == "put":
+                        self.entries[record.pop("key")] = record
+                    elif record.get("op") == "del":
+                        self.entries.pop(record["key"], None)
+                    elif record.get("op") == "pack":
+                        # Written by compact(): the pack file now in use
+                        self.data_path = os.path.join(self.directory, record["file"])
+        except OSError:
+            pass
+        self._remap()
+        self.verify()
+        self._remove_old_packs()
+
+    def _remap(self):
+        #Map the current data file. Caller holds the lock (or is __init__).
+        #Old maps are not closed: images built from them may still use their memory.
+        try:
+            with open(self.data_path, "rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        except OSError:
+            self.map = None
+
+    def verify(self, full=False):
+        """Check every index entry against its record header.
+        Args:
+            full: Also check the CRC32 of the pixel data (slower).
+        Returns:
+            The number of broken entries that were dropped.
+        """
+        with self.lock:
+            size = len(self.map) if self.map is not None else 0
+            broken = []
+            for key, entry in self.entries.items():
+                start = entry["offset"] - self.HEADER.size
+                if start < 0 or entry["offset"] + entry["length"] > size:
+                    broken.append(key)
+                    continue
+                magic, crc, length, width, height, mode = self.HEADER.unpack_from(self.map, start)
+                if (magic != self.MAGIC or crc != entry["crc"] or length != entry["length"]
+                        or [width, height] != list(entry["size"])):
+                    broken.append(key)
+                elif full and zlib.crc32(self.map[entry["offset"]:entry["offset"] + length]) != crc:
+                    broken.append(key)
+            for key in broken:
+                del self.entries[key]
+            if broken:
+                # Log the drop so the entries stay gone after a restart
+                with open(self.index_path, "a", encoding="utf-8") as f:
+                    for key in broken:
+                        f.write(json.dumps({"op": "del", "key": key}) + "\n")
+            return len(broken)
+
+    def get(self, key):
+        #Return a PIL image backed directly by the mapped pack, or None on a miss.
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if self.map is None or entry["offset"] + entry["length"] > len(self.map):
+                self._remap()
+            self.hits += 1
+            buffer = memoryview(self.map)[entry["offset"]:entry["offset"] + entry["length"]]
+        mode = entry["mode"]
+        return Image.frombuffer(mode, tuple(entry["size"]), buffer, "raw", mode, 0, 1)
+
+    def put(self, key, img):
+        #Append an image's raw pixels to the pack, padded to 4 bytes per pixel.
+        if img.mode not in ("RGBX", "RGBA"):
+            # Palette and RGB images can carry transparency outside their bands
+            img = img.convert("RGBA" if img.has_transparency_data else "RGBX")
+        pixels = img.tobytes()
+        crc = zlib.crc32(pixels)
+        header = self.HEADER.pack(self.MAGIC, crc, len(pixels), img.width, img.height,
+                                  img.mode.encode("ascii").ljust(4, b"\0"))
+        with self.lock:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(self.data_path, "ab") as f:
+                offset = f.tell() + len(header)
+                f.write(header + pixels)
+            entry = {"offset": offset, "length": len(pixels), "size": [img.width, img.height],
+                     "mode": img.mode, "crc": crc, "time": time.time()}
+            self.entries[key] = entry
+            with open(self.index_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(dict(entry, op="put", key=key)) + "\n")
+
+    def keys(self):
+        with self.lock:
+            return list(self.entries)
+
+    def invalidate(self, predicate):
+        #Forget every entry whose key matches predicate. Returns the count.
+        #The pixels stay in the pack until the next compaction.
+        with self.lock:
+            keys = [key for key in self.entries if predicate(key)]
+            for key in keys:
+                del self.entries[key]
+            if keys:
+                with open(self.index_path, "a", encoding="utf-8") as f:
+                    for key in keys:
+                        f.write(json.dumps({"op": "del", "key": key}) + "\n")
+            return len(keys)
+
+    def stats(self):
+        #Return entry count, bytes used, hit/miss counters and entry ages.
+        with self.lock:
+            now = time.time()
+            return {"entries": len(self.entries),
+                    "bytes": len(self.map) if self.map is not None else 0,
+                    "hits": self.hits,
+                    "misses": self.misses,
+                    "ages": age_buckets(now - entry["time"] for entry in self.entries.values())}
+
+    def compact(self):
+        #Rewrite live records into a fresh pack file. Safe to run on a background
+        #thread: readers keep using the old map until the new files are swapped in.
+        #Returns the number of files removed and bytes freed.
+        with self.lock:
+            entries = dict(self.entries)
+            old_map = self.map
+            old_path = self.data_path
+            old_size = len(old_map) if old_map is not None else 0
+        if old_map is None:
+            return {"files_removed": 0, "bytes_freed": 0}
+        # A new file name rather than replacing the old one, because a mapped
+        # file cannot be replaced on Windows
+        new_path = os.path.join(self.directory, f"thumbnails-{time.time_ns()}.pack")
+        new_entries = {}
+
+        def copy(f, source, key, entry):
+            start = entry["offset"] - self.HEADER.size
+            f.write(source[start:entry["offset"] + entry["length"]])
+            new_entries[key] = dict(entry, offset=f.tell() - entry["length"])
+
+        with open(new_path, "wb") as f:
+            for key, entry in entries.items():
+                if entry["offset"] + entry["length"] <= old_size:
+                    copy(f, old_map, key, entry)
+        with self.lock:
+            # Copy records added while we were busy, then swap
+            self._remap()
+            with open(new_path, "ab") as f:
+                for key, entry in self.entries.items():
+                    if key not in new_entries or entry is not entries.get(key):
+                        copy(f, self.map, key, entry)
+            new_entries = {key: entry for key, entry in new_entries.items() if key in self.entries}
+            tmp_path = self.index_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(json.dumps({"op": "pack", "file": os.path.basename(new_path)}) + "\n")
+                for key, entry in new_entries.items():
+                    f.write(json.dumps(dict(entry, op="put", key=key)) + "\n")
+            os.replace(tmp_path, self.index_path)
+            self.data_path = new_path
+            self.entries = new_entries
+            self._remap()
+            new_size = len(self.map) if self.map is not None else 0
+        removed = self._remove_old_packs()
+        return {"files_removed": removed, "bytes_freed": max(0, old_size - new_size)}
+
+    def _remove_old_packs(self):
+        #Delete pack files left behind by compaction. Returns how many were removed.
+        #Files still mapped on Windows are skipped and removed on a later run.
+        removed = 0
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return 0
+        for name in names:
+            path = os.path.join(self.directory, name)
+            if name.endswith(".pack") and path != self.data_path:
+                try:
+                    os.remove(path)
+                    removed += 1
+                except OSError:
+                    pass
+        return removed
+
+
+class ScheduledRequest:
+    # One queued request waiting for the RequestScheduler.
+
+    def __init__(self, url, priority, cancel_event, on_response):
+        self.url = url
+        self.priority = priority
+        self.cancel_event = cancel_event
+        self.on_response = on_response
+        self.attempts = 0
+        self.future = Future()
+
+
+class RequestScheduler:
+    # Central scheduler for every outgoing HTTP request.
+    # A token bucket caps the request rate and a priority queue decides what is
+    # sent next, so user actions overtake thumbnails and thumbnails overtake
+    # prefetching. One worker is kept free for user requests. A 429 response
+    # halves the rate and pauses sending for Retry-After; every success then
+    # raises the rate a little until it is back at the maximum.
+
+    def __init__(self, session, rate=10.0, burst=10, workers=4, min_rate=0.5, max_attempts=5):
+        self.session = session
+        self.max_rate = rate
+        self.rate = rate # current requests per second, lowered on 429
+        self.min_rate = min_rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.last_refill = time.monotonic()
+        self.paused_until = 0.0
+        self.max_attempts = max_attempts
+        self.workers = workers
+        self.busy = 0
+        self.sequence = 0 # keeps FIFO order within a priority
+        self.heap = []
+        self.condition = threading.Condition()
+        self.threads = []
+        # Counters shown in reports and used by the performance checks
+        self.requests_sent = 0
+        self.throttled = 0
+
+    def submit(self, url, priority=PRIORITY_USER, cancel_event=None, on_response=None):
+        #Queue a request and return a Future for its body (None if cancelled).
+        request = ScheduledRequest(url, priority, cancel_event, on_response)
+        self._enqueue(request)
+        return request.future
+
+    def request(self, url, priority=PRIORITY_USER, cancel_event=None, on_response=None):
+        #Queue a request and wait for its body.
+        return self.submit(url, priority, cancel_event, on_response).result()
+
+    def _enqueue(self, request):
+        with self.condition:
+            self.sequence += 1
+            heapq.heappush(self.heap, (request.priority, self.sequence, request))
+            if len(self.threads) < self.workers:
+                thread = threading.Thread(target=self._work, daemon=True)
+                self.threads.append(thread)
+                thread.start()
+            self.condition.notify()
+
+    def _next_request(self):
+        #Wait for a token and return the highest priority request. Caller holds the lock.
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.last_refill) * self.rate)
+            self.last_refill = now
+            if not self.heap:
+                self.condition.wait()
+                continue
+            # The last free worker only takes user requests
+            if self.busy >= self.workers - 1 and self.heap[0][0] != PRIORITY_USER:
+                self.condition.wait(0.05)
+                continue
+            wait = max(self.paused_until - now, (1 - self.tokens) / self.rate)
+            if wait > 0:
+                self.condition.wait(wait)
+                continue
+            self.tokens -= 1
+            self.busy += 1
+            return heapq.heappop(self.heap)[2]
+
+    def _work(self):
+        #Worker thread: send requests in priority order forever.
+        while True:
+            with self.condition:
+                request = self._next_request()
+            try:
+                self._send(request)
+            finally:
+                with self.condition:
+                    self.busy -= 1
+                    self.condition.notify()
+
+    def _send(self, request):
+        #Send one request, retrying with back-off when throttled.
+        if request.cancel_event is not None and request.cancel_event.is_set():
+            request.future.set_result(None)
+            return
+        try:
+            with self.condition:
+                self.requests_sent += 1
+            with self.session.get(request.url, stream=True, timeout=15) as response:
+                if request.on_response:
+                    request.on_response(response)
+                if response.status_code == 429 and request.attempts < self.max_attempts:
+                    request.attempts += 1
+                    self._throttle(response.headers.get("Retry-After"), request.attempts)
+                    self._enqueue(request)
+                    return
+                response.raise_for_status()
+                chunks = []
+                for chunk in response.iter_content(8192):
+                    if request.cancel_event is not None and request.cancel_event.is_set():
+                        request.future.set_result(None)
+                        return
+                    chunks.append(chunk)
+            with self.condition:
+                # Additive increase back towards the configured rate
+                self.rate = min(self.max_rate, self.rate + 0.1)
+            request.future.set_result(b"".join(chunks))
+        except Exception as e:
+            request.future.set_exception(e)
+
+    def set_max_rate(self, rate):
+        #Change the maximum request rate when switching to or from the cache daemon.
+        with self.condition:
+            # A higher limit applies straight away, a lower one keeps any 429 slowdown
+            self.rate = rate if rate > self.max_rate else min(self.rate, rate)
+            self.max_rate = rate
+            self.tokens = min(self.tokens, float(self.burst))
+
+    def _throttle(self, retry_after, attempts):
+        #Slow down after a 429 response.
+        try:
+            delay = float(retry_after)
+        except (TypeError, ValueError):
+            delay = 2 ** attempts
+        with self.condition:
+            self.throttled += 1
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = 0.0
+            self.paused_until = max(self.paused_until, time.monotonic() + delay)
+
+
+class MealDBClient:
+    # All access to TheMealDB goes through this client so that API responses,
+    # thumbnails and meal details are cached on disk. Used by the GUI and by
+    # the "cache" command line tool.
+
+    def __init__(self, cache_dir=CACHE_DIR, session=None, daemon=DAEMON_URL):
+        #session: optional stand-in for requests.Session, e.g. a FixtureSession.
+        #daemon: address of a shared cache daemon to use when it is running,
+        #or None to always talk to TheMealDB directly.
+        self.cache_dir = cache_dir
+        self.session = session or requests.Session()
+        self.daemon = daemon
+        self.daemon_checked = time.monotonic()
+        self.daemon_lock = threading.Lock()
+        self.daemon_url = daemon if daemon and self.daemon_alive(daemon) else None
+        # The daemon enforces TheMealDB's rate limit for all instances,
+        # so local requests to it only need the priority queue
+        self.scheduler = RequestScheduler(self.session, rate=DAEMON_RATE if self.daemon_url else DIRECT_RATE)
+        self.json_cache = DiskCache(os.path.join(cache_dir, "json"))
+        self.thumbnail_cache = ThumbnailPack(os.path.join(cache_dir, "thumbnails"))
+        self.catalog = MealCatalog(os.path.join(cache_dir, "details.json"))
+        self.stats_path = os.path.join(cache_dir, "stats.json")
+        # Meals whose details and thumbnails survive invalidation
+        self.pinned = set()
+        self.load_counters()
+
+    def tiers(self):
+        #Return the cache tiers by name.
+        return {"json": self.json_cache,
+                "thumbnails": self.thumbnail_cache,
+                "details": self.catalog}
+
+    def load_counters(self):
+        #Restore hit/miss counters saved by earlier runs.
+        try:
+            with open(self.stats_path, encoding="utf-8") as f:
+                counters = json.load(f)
+        except (OSError, ValueError):
+            return
+        for name, tier in self.tiers().items():
+            hits, misses = counters.get(name, (0, 0))
+            tier.hits += hits
+            tier.misses += misses
+
+    def save_counters(self):
+        #Persist hit/miss counters so ratios cover more than one run.
+        counters = {name: (tier.hits, tier.misses) for name, tier in self.tiers().items()}
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(self.stats_path, "w", encoding="utf-8") as f:
+                json.dump(counters, f)
+        except OSError as e:
+            print(f"Error saving cache statistics: {e}")
+
+    def close(self):
+        self.save_counters()
+        self.session.close()
+
+    def download(self, url, priority=PRIORITY_USER, cancel_event=None, on_response=None):
+        """Download a URL through the request scheduler and return its body.
+        Args:
+            url: The URL to fetch.
+            priority: One of the PRIORITY_* constants.
+            cancel_event: Optional threading.Event; when set the download stops
+                and None is returned.
+            on_response: Optional callback given the streamed response, so the
+                caller can close it to abort the transfer.
+        """
+        if self.daemon and not self.daemon_url:
+            self.recheck_daemon()
+        daemon_url = self.daemon_url
+        if daemon_url and url.startswith(DAEMON_UPSTREAM):
+            try:
+                return self.scheduler.request(
+                    f"{daemon_url}/fetch?priority={priority}&url={quote(url, safe='')}",
+                    priority, cancel_event, on_response)
+            except (requests.ConnectionError, requests.Timeout):
+                # Daemon went away or hangs, fall back to TheMealDB directly
+                self.use_daemon(None)
+        return self.scheduler.request(url, priority, cancel_event, on_response)
+
+    def daemon_alive(self, daemon_url):
+        #Return True if a cache daemon answers at daemon_url.
+        try:
+            with self.session.get(f"{daemon_url}/health", timeout=0.3) as response:
+                return response.status_code == 200
+        except requests.RequestException:
+            return False
+
+    def recheck_daemon(self):
+        #Switch back to the cache daemon if it answers again.
+        #Checked at most every DAEMON_RECHECK seconds, by one thread at a time.
+        if time.monotonic() - self.daemon_checked < DAEMON_RECHECK:
+            return
+        if not self.daemon_lock.acquire(blocking=False):
+            return
+        try:
+            self.daemon_checked = time.monotonic()
+            if self.daemon_alive(self.daemon):
+                self.use_daemon(self.daemon)
+        finally:
+            self.daemon_lock.release()
+
+    def use_daemon(self, daemon_url):
+        #Send requests through the daemon at daemon_url, or directly when None.
+        if daemon_url == self.daemon_url:
+            return
+        print(f"Using cache daemon at {daemon_url}" if daemon_url
+              else "Cache daemon unavailable, using TheMealDB directly")
+        self.daemon_url = daemon_url
+        self.daemon_checked = time.monotonic()
+        # The daemon enforces TheMealDB's rate limit for all instances
+        self.scheduler.set_max_rate(DAEMON_RATE if daemon_url else DIRECT_RATE)
+
+    def get_json(self, url, cache=True, priority=PRIORITY_USER, cancel_event=None, on_response=None):
+        #Return the decoded JSON for an API URL, using the JSON cache tier.
+        if cache:
+            data = self.json_cache.get(url, JSON_CACHE_TTL)
+            if data is not None:
+                return json.loads(data)
+        data = self.download(url, priority, cancel_event, on_response)
+        if data is None:
+            return None
+        result = json.loads(data)
+        if cache:
+            self.json_cache.put(url, data)
+        return result
+
+    def cached_json(self, url):
+        #Return a cached API response of any age without using the network, or None.
+        data = self.json_cache.get(url)
+        return json.loads(data) if data is not None else None
+
+    def pin_meals(self, meal_ids):
+        #Pin the details and thumbnails of these meals in the cache.
+        self.pinned = {str(meal_id) for meal_id in meal_ids}
+
+    def pinned_thumbnails(self):
+        #Return the image URLs of pinned meals.
+        return {meal["strMealThumb"] for meal in map(self.catalog.get, self.pinned)
+                if meal and meal.get("strMealThumb")}
+
+    def get_thumbnail(self, url, size, priority=PRIORITY_VISIBLE):
+        #Return the image at url resized to size as a PIL image, using the thumbnail pack.
+        img = self.cached_thumbnail(url, size)
+        if img is None:
+            img = Image.open(BytesIO(self.download(url, priority)))
+            img = img.resize(size)
+            self.thumbnail_cache.put(f"{url}@{size[0]}x{size[1]}", img)
+        return img
+
+    def cached_thumbnail(self, url, size):
+        #Return a thumbnail from the pack only, or None if it is not cached.
+        return self.thumbnail_cache.get(f"{url}@{size[0]}x{size[1]}")
+
+    def lookup_meal(self, meal_id, fetch=True):
+        #Return full meal details, from the local catalog when possible.
+        #fetch=False returns None for a meal that is not in the catalog.
+        meal = self.catalog.get(meal_id)
+        if meal is not None:
+            self.catalog.hits += 1
+            return meal
+        self.catalog.misses += 1
+        if not fetch:
+            return None
+        meals = self.get_json(f"{API_BASE}/lookup.php?i={meal_id}", cache=False).get("meals")
+        if meals:
+            self.remember_meal(meals[0])
+            return meals[0]
+        return None
+
+    def remember_meal(self, meal_data):
+        #Store full meal details in the local catalog.
+        try:
+            if self.catalog.add(meal_data):
+                self.catalog.save()
+        except OSError as e:
+            print(f"Error saving meal catalog: {e}")
+
+    def stats(self):
+        #Return statistics for every cache tier.
+        return {name: tier.stats() for name, tier in self.tiers().items()}
+
+    def invalidate(self, endpoint=None, category=None, area=None, tier=None):
+        """Remove cached entries and return how many were removed per tier.
+        Args:
+            endpoint: Drop cached responses of an API endpoint, e.g. "filter.php".
+            category: Drop the meal list, thumbnails and details of a category.
+            area: Drop the meal list, thumbnails and details of an area.
+            tier: Clear a whole tier ("json", "thumbnails" or "details").
+        """
+        removed = {"json": 0, "thumbnails": 0, "details": 0}
+        # Pinned meals (recently viewed) are never invalidated
+        pinned_thumbs = self.pinned_thumbnails()
+        if tier == "json":
+            removed["json"] += self.json_cache.invalidate(lambda key: True)
+        elif tier == "thumbnails":
+            removed["thumbnails"] += self.thumbnail_cache.invalidate(
+                lambda key: key.rsplit("@", 1)[0] not in pinned_thumbs)
+        elif tier == "details":
+            removed["details"] += self.catalog.remove(
+                [meal_id for meal_id in self.catalog.snapshot() if meal_id not in self.pinned])
+        if endpoint:
+            removed["json"] += self.json_cache.invalidate(
+                lambda key: os.path.basename(urlparse(key).path) == endpoint)
+        for param, value in (("c", category), ("a", area)):
+            if not value:
+                continue
+            def matches(key):
+                return [v.lower() for v in parse_qs(urlparse(key).query).get(param, [])] == [value.lower()]
+
+            # Thumbnails of the meals listed in the cached filter responses
+            thumbs = set()
+            for key in filter(matches, self.json_cache.keys()):
+                cached = self.json_cache.get(key, count=False)
+                for meal in (json.loads(cached).get("meals") or []) if cached else []:
+                    thumbs.add(meal["strMealThumb"])
+            removed["thumbnails"] += self.thumbnail_cache.invalidate(
+                lambda key: key.rsplit("@", 1)[0] in thumbs - pinned_thumbs)
+            removed["json"] += self.json_cache.invalidate(matches)
+            field = "strCategory" if param == "c" else "strArea"
+            removed["details"] += self.catalog.remove(
+                [meal_id for meal_id, meal in self.catalog.snapshot().items()
+                 if (meal.get(field) or "").lower() == value.lower() and meal_id not in self.pinned])
+        if removed["details"]:
+            self.catalog.save()
+        return removed
+
+    def warm(self, categories=(), areas=(), progress=print):
+        """Fill the cache with the meal lists and thumbnails of categories and areas.
+        Args:
+            categories: Category names, or ["all"] for every category.
+            areas: Area names, or ["all"] for every area.
+            progress: Called with a status message after each list.
+        Returns:
+            The number of meal lists warmed.
+        """
+        if "all" in categories:
+            categories = [c["strCategory"] for c in
+                          self.get_json(f"{API_BASE}/categories.php",
+                                        priority=PRIORITY_PREFETCH).get("categories") or []]
+        if "all" in areas:
+            areas = [a["strArea"] for a in
+                     self.get_json(f"{API_BASE}/list.php?a=list",
+                                   priority=PRIORITY_PREFETCH).get("meals") or []]
+        warmed = 0
+        for param, names in (("c", categories), ("a", areas)):
+            for name in names:
+                meals = self.get_json(f"{API_BASE}/filter.php?{param}={name}",
+                                      priority=PRIORITY_PREFETCH).get("meals") or []
+                for meal in meals:
+                    try:
+                        self.get_thumbnail(meal["strMealThumb"], (50, 50), PRIORITY_PREFETCH)
+                    except Exception as e:
+                        print(f"Error warming thumbnail: {e}")
+                warmed += 1
+                progress(f"Warmed {name}: {len(meals)} meals")
+        return warmed
+
+    def get_many_json(self, urls, priority=PRIORITY_PREFETCH):
+        #Download several API URLs concurrently, refreshing the JSON cache.
+        #Returns a dict of url -> decoded JSON. Raises if any download fails.
+        futures = {self.scheduler.submit(url, priority): url for url in urls}
+        results = {}
+        for future in as_completed(futures):
+            data = future.result()
+            self.json_cache.put(futures[future], data)
+            results[futures[future]] = json.loads(data)
+        return results
+
+    def remote_meal_ids(self, progress=print):
+        #List every meal id TheMealDB knows about using the cheap list endpoints.
+        lists = self.get_many_json([f"{API_BASE}/categories.php", f"{API_BASE}/list.php?a=list"])
+        categories = lists[f"{API_BASE}/categories.php"].get("categories") or []
+        areas = lists[f"{API_BASE}/list.php?a=list"].get("meals") or []
+        progress(f"Listing meals in {len(categories)} categories and {len(areas)} areas")
+        urls = ([f"{API_BASE}/filter.php?c={c['strCategory']}" for c in categories]
+                + [f"{API_BASE}/filter.php?a={a['strArea']}" for a in areas])
+        ids = set()
+        for data in self.get_many_json(urls).values():
+            ids.update(meal["idMeal"] for meal in data.get("meals") or [])
+        return ids
+
+    def sync_catalog(self, progress=print, checkpoint_every=10):
+        """Bring the local catalog up to date with TheMealDB.
+        Only new meals are looked up (concurrently, through the scheduler) and
+        meals no longer listed are removed. Progress is checkpointed to
+        sync_state.json, so an interrupted sync resumes where it stopped.
+        Args:
+            progress: Called with status messages.
+            checkpoint_every: Save the catalog and checkpoint after this many lookups.
+        Returns:
+            A dict with "added" and "removed" lists of [idMeal, strMeal], a
+            "failed" list of ids TheMealDB no longer knows, and a "retry" list
+            of ids whose lookup raised an error. Those stay in the checkpoint
+            and are looked up again by the next sync.
+        """
+        state_path = os.path.join(self.cache_dir, "sync_state.json")
+        try:
+            with open(state_path, encoding="utf-8") as f:
+                state = json.load(f)
+            progress(f"Resuming interrupted sync, {len(state['pending'])} meals left")
+        except (OSError, ValueError):
+            remote = self.remote_meal_ids(progress)
+            if not remote:
+                raise ValueError("TheMealDB listed no meals, refusing to empty the catalog")
+            local = set(self.catalog.snapshot())
+            state = {"pending": sorted(remote - local),
+                     "removed": [[meal_id, self.catalog.get(meal_id).get("strMeal")]
+                                 for meal_id in sorted(local - remote) if meal_id not in self.pinned],
+                     "added": [],
+                     "failed": []}
+
+        def checkpoint():
+            # Catalog first: a meal saved but still pending is just looked up again
+            self.catalog.save()
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(state_path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(state, f)
+            os.replace(state_path + ".tmp", state_path)
+
+        self.catalog.remove([meal_id for meal_id, name in state["removed"]])
+        checkpoint()
+        progress(f"{len(state['pending'])} new meals to look up, {len(state['removed'])} removed")
+
+        cancel_event = threading.Event()
+        futures = {self.scheduler.submit(f"{API_BASE}/lookup.php?i={meal_id}", PRIORITY_PREFETCH,
+                                         cancel_event): meal_id
+                   for meal_id in state["pending"]}
+        try:
+            for done, future in enumerate(as_completed(futures), 1):
+                meal_id = futures[future]
+                try:
+                    meals = json.loads(future.result()).get("meals")
+                except Exception as e:
+                    # Network errors are transient: keep the meal pending
+                    progress(f"Error looking up meal {meal_id}: {e}")
+                    continue
+                if meals:
+                    self.catalog.add(meals[0])
+                    state["added"].append([meal_id, meals[0]["strMeal"]])
+                else:
+                    state["failed"].append(meal_id)
+                state["pending"].remove(meal_id)
+                if done % checkpoint_every == 0:
+                    checkpoint()
+                    progress(f"Looked up {done} of {len(futures)} new meals")
+        finally:
+            # Stop queued lookups and save what we have, so the next run resumes
+            cancel_event.set()
+            checkpoint()
+        if not state["pending"]:
+            os.remove(state_path)
+        return {"added": state["added"], "removed": state["removed"], "failed": state["failed"],
+                "retry": list(state["pending"])}
+
+    def verify(self):
+        #Check every cached thumbnail against its CRC32, dropping broken ones.
+        #Returns the number of thumbnails dropped.
+        return self.thumbnail_cache.verify(full=True)
+
+    def compact(self):
+        #Compact every on-disk tier and return what was freed.
+        result = {"json": self.json_cache.compact(JSON_CACHE_TTL),
+                  "thumbnails": self.thumbnail_cache.compact()}
+        try:
+            before = os.path.getsize(self.catalog.path)
+            self.catalog.save()
+            result["details"] = {"files_removed": 0,
+                                 "bytes_freed": before - os.path.getsize(self.catalog.path)}
+        except OSError:
+            result["details"] = {"files_removed": 0, "bytes_freed": 0}
+        return result
+
+
+def format_cache_report(stats):
+    #Format MealDBClient.stats() as a readable text report.
+    lines = []
+    for name, tier in stats.items():
+        lookups = tier["hits"] + tier["misses"]
+        ratio = f"{tier['hits'] / lookups:.0%}" if lookups else "n/a"
+        lines.append(f"{name}: {tier['entries']} entries, {tier['bytes'] / 1024:.1f} KiB, "
+                     f"hits {tier['hits']} / misses {tier['misses']} (hit ratio {ratio})")
+        lines.append("    age: " + ", ".join(f"{k}: {v}" for k, v in tier["ages"].items()))
+    return "\n".join(lines)
+
+
+def format_sync_report(report):
+    #Format MealDBClient.sync_catalog() results as readable text.
+    lines = [f"Added {len(report['added'])} meals, removed {len(report['removed'])}, "
+             f"failed {len(report['failed'])}, {len(report['retry'])} to retry next sync"]
+    lines += [f"  + {name} ({meal_id})" for meal_id, name in report["added"]]
+    lines += [f"  - {name} ({meal_id})" for meal_id, name in report["removed"]]
+    lines += [f"  ! lookup failed for {meal_id}" for meal_id in report["failed"]]
+    lines += [f"  ? lookup error for {meal_id}, retried next sync" for meal_id in report["retry"]]
+    return "\n".join(lines)
+
+
+class SessionState:
+    # Recently viewed meals plus the tab and window layout, saved between runs
+    # so the next launch can restore the session from the local cache.
+
+    def __init__(self, path, limit=RECENT_LIMIT):
+        self.path = path
+        self.limit = limit
+        self.recent = [] # meal ids, newest first
+        self.windows = [] # open result windows, e.g. {"type": "meal", "id": "52772"}
+        self.tabs = {} # selected tab, entry texts and loaded lists
+        self.explored = False # True once the user got past the welcome screen
+        self.load()
+
+    def load(self):
+        #Load the saved session, starting fresh if the file is missing or broken.
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            self.recent = list(data.get("recent", []))[:self.limit]
+            self.windows = list(data.get("windows", []))
+            self.tabs = dict(data.get("tabs", {}))
+            self.explored = bool(data.get("explored", False))
+        except (OSError, ValueError, AttributeError, TypeError):
+            pass
+
+    def save(self):
+        #Write the session to disk atomically.
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"recent": self.recent,
+                           "windows": self.windows,
+                           "tabs": self.tabs,
+                           "explored": self.explored}, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Error saving session: {e}")
+
+    def add_recent(self, meal_id):
+        #Move a meal to the front of the recently viewed list.
+        meal_id = str(meal_id)
+        if meal_id in self.recent:
+            self.recent.remove(meal_id)
+        self.recent.insert(0, meal_id)
+        del self.recent[self.limit:]
+
+
+class PantryIndex:
+    # Meal x ingredient bitset matrix used to rank meals by pantry coverage.
+    # Every ingredient gets a bit position and every meal row is an int bitmask,
+    # so scoring one meal is a single AND-NOT plus a popcount.
+
+    def __init__(self, meals):
+        self.columns = {} # ingredient name -> bit position
+        self.names = [] # bit position -> ingredient name
+        self.rows = [] # (bitmask, meal) per meal
+        for meal in meals:
+            mask = 0
+            for name in meal_ingredients(meal):
+                bit = self.columns.get(name)
+                if bit is None:
+                    bit = self.columns[name] = len(self.names)
+                    self.names.append(name)
+                mask |= 1 << bit
+            self.rows.append((mask, meal))
+
+    def pantry_mask(self, ingredients):
+        #Convert the user's ingredients into a bitmask, ignoring unknown ones.
+        mask = 0
+        for ingredient in ingredients:
+            bit = self.columns.get(" ".join(ingredient.lower().split()))
+            if bit is not None:
+                mask |= 1 << bit
+        return mask
+
+    def missing_names(self, mask):
+        #Decode a bitmask back into ingredient names.
+        names = []
+        while mask:
+            low = mask & -mask
+            names.append(self.names[low.bit_length() - 1])
+            mask ^= low
+        return names
+
+    def rank(self, ingredients, limit=None):
+        """Rank every meal by how many required ingredients are missing.
+        Args:
+            ingredients: The ingredient names the user has.
+            limit: Maximum number of results to return (all when None).
+        Returns:
+            A list of (missing_count, matched_count, meal, missing_mask) tuples,
+            fewest missing first.
+        """
+        pantry = self.pantry_mask(ingredients)
+        scored = []
+        for mask, meal in self.rows:
+            missing = mask & ~pantry
+            scored.append((bin(missing).count("1"), bin(mask & pantry).count("1"), meal, missing))
+        scored.sort(key=lambda row: (row[0], -row[1], row[2]["strMeal"]))
+        return scored[:limit] if limit else scored
+
+
+class RequestPipeline:
+    # Debounced, de-duplicated and cancellable JSON requests for one input.
+    # Each submit bumps a generation number; only the response for the newest
+    # generation reaches the UI, so slow older responses can never overwrite
+    # newer ones. Network work happens on a worker thread and results are
+    # handed back to the Tk thread through a queue.
+
+    def __init__(self, root, client, delay=250, cache=True):
+        self.root = root
+        self.client = client
+        self.delay = delay # debounce delay in milliseconds
+        self.cache = cache # False for responses that must always be fetched
+        self.generation = 0
+        self.query = None # URL of the newest submitted query
+        self.busy = False # True until the newest query has been delivered
+        self.pending = None # after() id of the debounced start
+        self.cancel_event = None
+        self.responses = {} # generation -> in-flight response, closed on cancel
+        self.workers = 0
+        self.results = queue.Queue()
+
+    def submit(self, url, on_success, on_error):
+        #Queue a request, replacing any pending or in-flight one.
+        if self.busy and url == self.query:
+            # Same query is already waiting or running
+            return
+        self.cancel()
+        self.generation += 1
+        self.query = url
+        self.busy = True
+        generation = self.generation
+        self.pending = self.root.after(
+            self.delay, lambda: self._start(generation, url, on_success, on_error))
+
+    def cancel(self):
+        #Drop the pending request and abort the in-flight one, if any.
+        if self.pending is not None:
+            self.root.after_cancel(self.pending)
+            self.pending = None
+        if self.cancel_event is not None:
+            self.cancel_event.set()
+            self.cancel_event = None
+            for response in list(self.responses.values()):
+                # Closing the response drops the connection mid-download
+                response.close()
+        self.busy = False
+
+    def _start(self, generation, url, on_success, on_error):
+        #Start the debounced request on a worker thread.
+        self.pending = None
+        self.cancel_event = threading.Event()
+        self.workers += 1
+        threading.Thread(target=self._fetch,
+                         args=(generation, url, self.cancel_event, on_success, on_error),
+                         daemon=True).start()
+        if self.workers == 1:
+            self.root.after(50, self._poll)
+
+    def _fetch(self, generation, url, cancel_event, on_success, on_error):
+        #Worker thread: download the response unless cancelled.
+        def track(response):
+            self.responses[generation] = response
+            if cancel_event.is_set():
+                response.close()
+
+        try:
+            data = self.client.get_json(url, cache=self.cache, cancel_event=cancel_event,
+                                        on_response=track)
+            if cancel_event.is_set():
+                self.results.put((generation, None, None))
+            else:
+                self.results.put((generation, on_success, data))
+        except Exception as e:
+            self.results.put((generation, None if cancel_event.is_set() else on_error, e))
+        finally:
+            self.responses.pop(generation, None)
+
+    def _poll(self):
+        #Tk thread: deliver finished results, dropping stale generations.
+        while True:
+            try:
+                generation, callback, value = self.results.get_nowait()
+            except queue.Empty:
+                break
+            self.workers -= 1
+            if generation != self.generation or callback is None:
+                continue
+            self.busy = False
+            self.cancel_event = None
+            callback(value)
+        if self.workers:
+            self.root.after(50, self._poll)
+
 
 class MealDBExplorer:
     # Main application class for the MealDB Explorer.
     # Handles all GUI and API interactions.
 
-    def __init__(self):
+    def __init__(self, client=None):
         #Initialize the main application window and setup components.
+        #client: optional MealDBClient, e.g. one replaying recorded fixtures.
         # Create the main application window
         self.root = Tk()
         # Initialize color scheme
@@ -30,6 +1281,45 @@ class MealDBExplorer:
         self.setup_tabs()
         #Configure visual styles
         self.configure_styles()
+        # Cached API client and the local meal catalog used by the pantry tab
+        self.client = client or MealDBClient()
+        self.catalog = self.client.catalog
+        self.pantry_index = None
+        self.pantry_index_version = None
+        # One request pipeline per search input
+        self.meal_pipeline = RequestPipeline(self.root, self.client)
+        self.ingredient_pipeline = RequestPipeline(self.root, self.client)
+        self.area_pipeline = RequestPipeline(self.root, self.client)
+        # Button requests also run in the background, so a request held back by
+        # the scheduler never freezes the window. They need no debounce.
+        self.categories_pipeline = RequestPipeline(self.root, self.client, delay=0)
+        self.areas_pipeline = RequestPipeline(self.root, self.client, delay=0)
+        self.category_meals_pipeline = RequestPipeline(self.root, self.client, delay=0)
+        self.lookup_pipeline = RequestPipeline(self.root, self.client, delay=0, cache=False)
+        self.random_pipeline = RequestPipeline(self.root, self.client, delay=0, cache=False)
+        self.pipelines = (self.meal_pipeline, self.ingredient_pipeline, self.area_pipeline,
+                          self.categories_pipeline, self.areas_pipeline,
+                          self.category_meals_pipeline, self.lookup_pipeline, self.random_pipeline)
+        # Background thumbnail loading for result lists
+        self.thumbnail_pool = ThreadPoolExecutor(max_workers=8)
+        self.thumbnail_results = queue.Queue()
+        self.thumbnail_placeholders = {}
+        self.thumbnails_pending = 0
+        # Recently viewed meals and the previous session layout
+        self.session_state = SessionState(os.path.join(self.client.cache_dir, "session.json"))
+        self.client.pin_meals(self.session_state.recent)
+        self.open_windows = {} # Toplevel -> description used to reopen it
+        self.recent_placeholder = None
+        self.recent_dirty = False
+        self.categories_loaded = False
+        self.areas_loaded = False
+        self.last_ingredient = None
+        self.restoring = False # True while restore_session rebuilds the last session
+        # Save the session and cache statistics when the window is closed
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+        # Skip the welcome screen and restore the last session if there was one
+        if self.session_state.explored:
+            self.restore_session()
 
     def initialize_colors(self):
         #Initialize the color scheme for the application.
@@ -174,6 +1464,9 @@ class MealDBExplorer:
         self.categories_tab = Frame(self.tab_control, bg="#1e3c72")
         self.random_tab = Frame(self.tab_control, bg="#1e3c72")
         self.area_tab = Frame(self.tab_control, bg="#1e3c72")
+        self.pantry_tab = Frame(self.tab_control, bg="#1e3c72")
+        self.cache_tab = Frame(self.tab_control, bg="#1e3c72")
+        self.recent_tab = Frame(self.tab_control, bg="#1e3c72")
         
         # Add tabs to notebook with labels
         self.tab_control.add(self.meal_tab, text="Search Meal")
@@ -181,6 +1474,10 @@ class MealDBExplorer:
         self.tab_control.add(self.categories_tab, text="Meal Categories")
         self.tab_control.add(self.random_tab, text="Random Meal")
         self.tab_control.add(self.area_tab, text="Filter by Area")
+        self.tab_control.add(self.pantry_tab, text="What Can I Cook")
+        self.tab_control.add(self.recent_tab, text="Recent")
+        self.tab_control.bind("<<NotebookTabChanged>>", self.on_tab_changed)
+        self.tab_control.add(self.cache_tab, text="Cache")
 
     def create_button(self, parent, text, command):
         #Create a modern styled button with hover effects.
@@ -210,23 +1507,23 @@ class MealDBExplorer:
         Args:
             meal_id: The unique identifier of the meal to fetch.
         """
-        # Fetch meal details from API
-        url = f"https://www.themealdb.com/api/json/v1/1/lookup.php?i={meal_id}"
-        try:
-            # Send GET request to API
-            response = requests.get(url)
-            response.raise_for_status()
-            data = response.json()
-            meal = data.get("meals", [])
-            
-            # Display meal details
-            if meal:
-                self.display_meal_details(meal[0])
-            else:
-                print("Meal not found")
-                
-        except Exception as e:
-            messagebox.showerror(f"Error fetching meal details: {e}")
+        # Meals in the local catalog are shown straight away,
+        # others are fetched in the background
+        meal = self.client.lookup_meal(meal_id, fetch=False)
+        if meal:
+            self.display_meal_details(meal)
+        else:
+            self.lookup_pipeline.submit(f"{API_BASE}/lookup.php?i={meal_id}",
+                                        self.show_looked_up_meal,
+                                        self.show_request_error)
+
+    def show_looked_up_meal(self, data):
+        #Display a meal fetched by ID.
+        meals = data.get("meals")
+        if meals:
+            self.display_meal_details(meals[0])
+        else:
+            print("Meal not found")
 
     def setup_search_tab(self):
         #Set up the meal search tab with search functionality.
@@ -245,6 +1542,7 @@ class MealDBExplorer:
                               width=30,
                               justify=CENTER)
         self.meal_entry.pack(pady=10)
+        self.meal_entry.bind("<Return>", lambda e: self.search_meal())
 
         # Create search button
         self.create_button(self.meal_tab,
@@ -288,6 +1586,7 @@ class MealDBExplorer:
                                     width=30,
                                     justify=CENTER)
         self.ingredient_entry.pack(pady=10)
+        self.ingredient_entry.bind("<Return>", lambda e: self.search_by_ingredient())
         # Create search button
         self.create_button(self.ingredients_tab,
                           "Search by Ingredient",
@@ -385,26 +1684,24 @@ class MealDBExplorer:
         self.setup_categories_tab()
         self.setup_random_tab()
         self.setup_area_tab()
+        self.setup_pantry_tab()
+        self.setup_recent_tab()
+        self.setup_cache_tab()
+        self.session_state.explored = True
 
-    def fetch_meal_data(self, url, name_input=None):
-        #Fetch meal data from the API.
-        try:
-            # Send a GET request to the API
-            if name_input:
-                url = f"{url}?s={name_input.strip()}"
-            response = requests.get(url)
-            response.raise_for_status()
-            return response.json().get("meals", [])
-        except Exception as e:
-            messagebox.showerror("Error", f"Error fetching data: {e}")
-            return None
-        
-    def display_meal_details(self, meal_data):
+    def display_meal_details(self, meal_data, record=True):
         #Display detailed meal information in a new window.
         # The window will contain the meal name, ingredients, and instructions.
+        # record=False reopens a window without changing the recent list.
+
+        # Remember the full details for the pantry tab
+        self.client.remember_meal(meal_data)
+        if record:
+            self.add_recent_meal(meal_data)
 
         # Create new window for meal details.
         details_window = Toplevel(self.root)
+        self.track_window(details_window, {"type": "meal", "id": meal_data["idMeal"]})
         details_window.title(meal_data["strMeal"])
         details_window.geometry("800x600")
         details_window.configure(bg="#1e3c72")
@@ -429,17 +1726,9 @@ class MealDBExplorer:
               fg="white",
               bg="#1e3c72").pack(pady=20)
 
-        # load and display meal image
-        try:
-            response = requests.get(meal_data["strMealThumb"])
-            img = Image.open(BytesIO(response.content))
-            img = img.resize((300, 300))
-            photo = ImageTk.PhotoImage(img)
-            img_label = Label(scrollable_frame, image=photo, bg="#1e3c72")
-            img_label.image = photo
-            img_label.pack(pady=10)
-        except Exception as e:
-            messagebox.showerror(f"Error loading image: {e}")
+        # load and display meal image in the background
+        self.thumbnail_label(scrollable_frame, meal_data["strMealThumb"], (300, 300),
+                             PRIORITY_USER).pack(pady=10)
 
         # Display category and area
         info_frame = Frame(scrollable_frame, bg="#1e3c72")
@@ -494,91 +1783,103 @@ class MealDBExplorer:
 
     def search_meal(self):
         #Handle meal search functionality.
+        #The request is debounced and runs in the background.
         meal_name = self.meal_entry.get().strip()
         if meal_name:
-            meals = self.fetch_meal_data("https://www.themealdb.com/api/json/v1/1/search.php", meal_name)
-            if meals:
-                self.display_meal_details(meals[0])
-            else:
-                messagebox.showerror("No meal found", "Please try again.")
+            self.meal_pipeline.submit(f"{API_BASE}/search.php?s={meal_name}",
+                                      self.show_searched_meal,
+                                      self.show_request_error)
+
+    def show_searched_meal(self, data):
+        #Display the first meal returned by a name search.
+        meals = data.get("meals")
+        if meals:
+            self.display_meal_details(meals[0])
+        else:
+            messagebox.showerror("No meal found", "Please try again.")
+
+    def show_request_error(self, error):
+        #Report a failed background request.
+        messagebox.showerror("Error", f"Error fetching data: {error}")
 
     def search_by_ingredient(self):
         #Handle ingredient search functionality.
         ingredient = self.ingredient_entry.get().strip()
         if ingredient:
-            url = f"https://www.themealdb.com/api/json/v1/1/filter.php?i={ingredient}"
-            try:
-                response = requests.get(url)
-                response.raise_for_status()
-                data = response.json()
-                meals = data.get("meals")
-                
-                # Clear existing results
-                for widget in self.ingredients_placeholder.winfo_children():
-                    widget.destroy()
-                # Handle the case where no meals are found for the ingredient
-                if not meals:
-                    messagebox.showinfo("No Results", f"No meals found with ingredient: {ingredient}")
-                    return
-                # Create scrollable frame for results
-                canvas = Canvas(self.ingredients_placeholder, bg="#1e3c72")
-                scrollbar = ttk.Scrollbar(self.ingredients_placeholder, orient="vertical", command=canvas.yview)
-                scrollable_frame = Frame(canvas, bg="#1e3c72")
+            self.ingredient_pipeline.submit(
+                f"{API_BASE}/filter.php?i={ingredient}",
+                lambda data: self.display_ingredient_meals(ingredient, data),
+                self.show_ingredient_error)
+        else:
+            # If no ingredients was entered , display a message enter an ingredient.
+            messagebox.showwarning("Input Required", "Please enter an ingredient.")
 
-                canvas.configure(yscrollcommand=scrollbar.set)
-                scrollable_frame.bind("<Configure>", lambda e: canvas.configure(scrollregion=canvas.bbox("all")))
-                canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
+    def display_ingredient_meals(self, ingredient, data):
+        #Display the meals returned by an ingredient search.
+        try:
+            meals = data.get("meals")
+            self.last_ingredient = ingredient
 
-                # Display meal buttons
-                for meal in meals:
-                    meal_frame = Frame(scrollable_frame, bg="#1e3c72")
-                    meal_frame.pack(fill=X, pady=5, padx=10)
+            # Clear existing results
+            for widget in self.ingredients_placeholder.winfo_children():
+                widget.destroy()
+            # Handle the case where no meals are found for the ingredient
+            if not meals:
+                messagebox.showinfo("No Results", f"No meals found with ingredient: {ingredient}")
+                return
+            # Create scrollable frame for results
+            canvas = Canvas(self.ingredients_placeholder, bg="#1e3c72")
+            scrollbar = ttk.Scrollbar(self.ingredients_placeholder, orient="vertical", command=canvas.yview)
+            scrollable_frame = Frame(canvas, bg="#1e3c72")
 
-                    try:
-                        # Load and display meal thumbnail
-                        response = requests.get(meal["strMealThumb"]) # Load the image from the URL
-                        img = Image.open(BytesIO(response.content)) # Open the image file
-                        img = img.resize((50, 50)) # Resize the image to 50x50 pixels
-                        photo = ImageTk.PhotoImage(img) # Convert the image to a PhotoImage object
-                        img_label = Label(meal_frame, image=photo, bg="#1e3c72") # Create a Label widget with the image
-                        img_label.image = photo # Keep a reference to the image to prevent it from being garbage collected
-                        img_label.pack(side=LEFT, padx=5) # Pack the image label to the left of the meal frame
-                    except Exception as e:
-                        print(f"Error loading thumbnail: {e}")  
-                        messagebox.showerror("Error", f"Error loading thumbnail: {e}")
+            canvas.configure(yscrollcommand=scrollbar.set)
+            scrollable_frame.bind("<Configure>", lambda e: canvas.configure(scrollregion=canvas.bbox("all")))
+            canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
 
-                    button = Button(meal_frame,
-                                  text=meal["strMeal"],
-                                  font=("Helvetica", 12),
-                                  bg="#4e8ccf",
-                                  fg="white",
-                                  command=lambda id=meal["idMeal"]: self.fetch_and_display_meal(id))
-                    button.pack(side=LEFT, fill=X, expand=True, padx=5)
+            # Display meal buttons
+            for meal in meals:
+                meal_frame = Frame(scrollable_frame, bg="#1e3c72")
+                meal_frame.pack(fill=X, pady=5, padx=10)
 
-                scrollbar.pack(side=RIGHT, fill=Y)
-                canvas.pack(side=LEFT, fill=BOTH, expand=True)
+                # Load and display meal thumbnail (50x50 pixels) in the background
+                img_label = self.thumbnail_label(meal_frame, meal["strMealThumb"], (50, 50))
+                img_label.pack(side=LEFT, padx=5) # Pack the image label to the left of the meal frame
 
-            except Exception as e:
-                # Handle any exceptions by clearing the placeholder and displaying an error message.
-                for widget in self.ingredients_placeholder.winfo_children():
-                    widget.destroy()
-                Label(self.ingredients_placeholder,
-                      text=f"Error: {e}",
-                      font=("Helvetica", 16),
-                      fg="white",
-                      bg="#1e3c72").pack(pady=10)
-        else:
-            # If no ingredients was entered , display a message enter an ingredient.
-            messagebox.showwarning("Input Required", "Please enter an ingredient.")
+                button = Button(meal_frame,
+                              text=meal["strMeal"],
+                              font=("Helvetica", 12),
+                              bg="#4e8ccf",
+                              fg="white",
+                              command=lambda id=meal["idMeal"]: self.fetch_and_display_meal(id))
+                button.pack(side=LEFT, fill=X, expand=True, padx=5)
+
+            scrollbar.pack(side=RIGHT, fill=Y)
+            canvas.pack(side=LEFT, fill=BOTH, expand=True)
+
+        except Exception as e:
+            self.show_ingredient_error(e)
+
+    def show_ingredient_error(self, e):
+        # Handle any exceptions by clearing the placeholder and displaying an error message.
+        for widget in self.ingredients_placeholder.winfo_children():
+            widget.destroy()
+        Label(self.ingredients_placeholder,
+              text=f"Error: {e}",
+              font=("Helvetica", 16),
+              fg="white",
+              bg="#1e3c72").pack(pady=10)
 
-    def fetch_categories(self):
+    def fetch_categories(self, data=None):
         #Fetch and display meal categories.
-        url = "https://www.themealdb.com/api/json/v1/1/categories.php"
+        #data: the categories.php response; fetched in the background when None.
+        if data is None:
+            self.categories_pipeline.submit(f"{API_BASE}/categories.php",
+                                            self.fetch_categories,
+                                            self.show_categories_error)
+            return
         try:
-            response = requests.get(url)
-            response.raise_for_status()
-            data = response.json()
             categories = data.get("categories")
+            self.categories_loaded = bool(categories)
             
             # Clear existing results
             for widget in self.categories_placeholder.winfo_children():
@@ -609,18 +1910,8 @@ class MealDBExplorer:
                 category_frame = Frame(scrollable_frame, bg="#1e3c72", padx=10, pady=10)
                 category_frame.grid(row=row, column=col, sticky="nsew")
 
-                try:
-                    # Load and display category thumbnail
-                    response = requests.get(category["strCategoryThumb"])
-                    img = Image.open(BytesIO(response.content))
-                    img = img.resize((100, 100))
-                    photo = ImageTk.PhotoImage(img)
-                    img_label = Label(category_frame, image=photo, bg="#1e3c72")
-                    img_label.image = photo
-                    img_label.pack()
-                except Exception as e:
-                    print(f"Error loading category thumbnail: {e}") 
-                    messagebox.showerror("Error", f"Error loading category thumbnail: {e}")
+                # Load and display category thumbnail in the background
+                self.thumbnail_label(category_frame, category["strCategoryThumb"], (100, 100)).pack()
                 Label(category_frame,
                       text=category["strCategory"],
                       font=("Helvetica", 12, "bold"),
@@ -644,25 +1935,33 @@ class MealDBExplorer:
             canvas.pack(side=LEFT, fill=BOTH, expand=True)
 
         except Exception as e:
-            for widget in self.categories_placeholder.winfo_children():
-                widget.destroy()
-            Label(self.categories_placeholder,
-                  text=f"Error: {e}",
-                  font=("Helvetica", 16),
-                  fg="white",
-                  bg="#1e3c72").pack(pady=10)
+            self.show_categories_error(e)
+
+    def show_categories_error(self, e):
+        # Replace the categories with an error message.
+        for widget in self.categories_placeholder.winfo_children():
+            widget.destroy()
+        Label(self.categories_placeholder,
+              text=f"Error: {e}",
+              font=("Helvetica", 16),
+              fg="white",
+              bg="#1e3c72").pack(pady=10)
 
-    def fetch_meals_by_category(self, category):
+    def fetch_meals_by_category(self, category, data=None):
         #Fetch and display meals for a specific category.
-        url = f"https://www.themealdb.com/api/json/v1/1/filter.php?c={category}"
+        #data: the filter.php response; fetched in the background when None.
+        if data is None:
+            self.category_meals_pipeline.submit(
+                f"{API_BASE}/filter.php?c={category}",
+                lambda data: self.fetch_meals_by_category(category, data),
+                self.show_request_error)
+            return
         try:
-            response = requests.get(url)
-            response.raise_for_status()
-            data = response.json()
             meals = data.get("meals", [])
             
             if meals: # If meals exist, create a new window to display them.
                 category_window = Toplevel(self.root) # Create a new window.
+                self.track_window(category_window, {"type": "category", "name": category})
                 category_window.title(f"{category} Meals") # Set the window title.
                 category_window.geometry("600x800") # Set the window size.
                 category_window.configure(bg="#1e3c72")
@@ -686,16 +1985,8 @@ class MealDBExplorer:
                     meal_frame = Frame(scrollable_frame, bg="#1e3c72")
                     meal_frame.pack(fill=X, pady=5, padx=10)
 
-                    try:
-                        response = requests.get(meal["strMealThumb"])
-                        img = Image.open(BytesIO(response.content))
-                        img = img.resize((50, 50))
-                        photo = ImageTk.PhotoImage(img)
-                        img_label = Label(meal_frame, image=photo, bg="#1e3c72")
-                        img_label.image = photo
-                        img_label.pack(side=LEFT, padx=5)
-                    except Exception as e:
-                        print(f"Error loading meal thumbnail: {e}")
+                    img_label = self.thumbnail_label(meal_frame, meal["strMealThumb"], (50, 50))
+                    img_label.pack(side=LEFT, padx=5)
 
                     button = Button(meal_frame,
                                   text=meal["strMeal"],
@@ -715,7 +2006,12 @@ class MealDBExplorer:
     def show_random_meal(self):
         #Fetch and display a random meal.
         url = "https://www.themealdb.com/api/json/v1/1/random.php"
-        meals = self.fetch_meal_data(url) # Fetch meal data from API
+        # Fetched in the background and never cached
+        self.random_pipeline.submit(url, self.display_random_meal, self.show_request_error)
+
+    def display_random_meal(self, data):
+        #Display the meal returned by random.php.
+        meals = data.get("meals")
         if meals:
             self.display_meal_details(meals[0]) # Display meal details random meals
         else:
@@ -739,14 +2035,17 @@ class MealDBExplorer:
                                     bd=2)
         self.area_placeholder.pack(fill=BOTH, expand=True, pady=20)
 
-    def fetch_areas(self):
+    def fetch_areas(self, data=None):
         #Fetch and display all available areas as clickable buttons.
-        url = "https://www.themealdb.com/api/json/v1/1/list.php?a=list"
+        #data: the list.php response; fetched in the background when None.
+        if data is None:
+            self.areas_pipeline.submit(f"{API_BASE}/list.php?a=list",
+                                       self.fetch_areas,
+                                       self.show_areas_error)
+            return
         try:
-            response = requests.get(url)
-            response.raise_for_status()
-            data = response.json()
             areas = data.get("meals", [])
+            self.areas_loaded = bool(areas)
 
             # Clear existing content
             for widget in self.area_placeholder.winfo_children():
@@ -793,25 +2092,33 @@ class MealDBExplorer:
             canvas.pack(side=LEFT, fill=BOTH, expand=True)
 
         except Exception as e:
-            for widget in self.area_placeholder.winfo_children():
-                widget.destroy()
-            Label(self.area_placeholder,
-                  text=f"Error: {e}",
-                  font=("Helvetica", 16),
-                  fg="white",
-                  bg="#1e3c72").pack(pady=10)
+            self.show_areas_error(e)
+
+    def show_areas_error(self, e):
+        # Replace the areas with an error message.
+        for widget in self.area_placeholder.winfo_children():
+            widget.destroy()
+        Label(self.area_placeholder,
+              text=f"Error: {e}",
+              font=("Helvetica", 16),
+              fg="white",
+              bg="#1e3c72").pack(pady=10)
 
     def show_area_meals(self, area):
+        #Request the meals for the selected area.
+        #Repeated clicks are debounced so only one window opens.
+        self.area_pipeline.submit(f"{API_BASE}/filter.php?a={area}",
+                                  lambda data: self.display_area_meals(area, data),
+                                  self.show_request_error)
+
+    def display_area_meals(self, area, data):
         #Display meals for the selected area in a new window.
-        url = f"https://www.themealdb.com/api/json/v1/1/filter.php?a={area}"
         try:
-            response = requests.get(url)
-            response.raise_for_status()
-            data = response.json()
             meals = data.get("meals", [])
 
             if meals:
                 area_window = Toplevel(self.root)
+                self.track_window(area_window, {"type": "area", "name": area})
                 area_window.title(f"Meals from {area}")
                 area_window.geometry("600x800")
                 area_window.configure(bg="#1e3c72")
@@ -835,18 +2142,9 @@ class MealDBExplorer:
                     meal_frame = Frame(scrollable_frame, bg="#1e3c72")
                     meal_frame.pack(fill=X, pady=5, padx=10)
 
-                    try:
-                        response = requests.get(meal["strMealThumb"])
-                        img = Image.open(BytesIO(response.content))
-                        img = img.resize((50, 50))
-                        photo = ImageTk.PhotoImage(img)
-                        img_label = Label(meal_frame, image=photo, bg="#1e3c72")
-                        img_label.image = photo
-                        img_label.pack(side=LEFT, padx=5)
-                    except Exception as e:
-                        print(f"Error fetching meals for area: {e}") 
-                        messagebox.showerror("Error", f"Error fetching meals for area: {e}")
-                        
+                    img_label = self.thumbnail_label(meal_frame, meal["strMealThumb"], (50, 50))
+                    img_label.pack(side=LEFT, padx=5)
+
                     button = Button(meal_frame,
                                   text=meal["strMeal"],
                                   font=("Helvetica", 12),
@@ -861,11 +2159,955 @@ class MealDBExplorer:
         except Exception as e:
             messagebox.showerror("Error", f"Error fetching data: {e}")
 
+    def thumbnail_label(self, parent, url, size, priority=PRIORITY_VISIBLE):
+        #Create a Label that shows a thumbnail once it has loaded in the background.
+        #Rows appear straight away instead of waiting for every image.
+        if size not in self.thumbnail_placeholders:
+            self.thumbnail_placeholders[size] = PhotoImage(width=size[0], height=size[1])
+        label = Label(parent, image=self.thumbnail_placeholders[size], bg="#1e3c72")
+        if self.restoring:
+            # Restoring never touches the network: cached thumbnails only
+            img = self.client.cached_thumbnail(url, size)
+            if img is not None:
+                photo = ImageTk.PhotoImage(img)
+                label.config(image=photo)
+                label.image = photo
+            return label
+        future = self.thumbnail_pool.submit(self.client.get_thumbnail, url, size, priority)
+        future.add_done_callback(lambda f: self.thumbnail_results.put((label, f)))
+        self.thumbnails_pending += 1
+        if self.thumbnails_pending == 1:
+            self.root.after(50, self.poll_thumbnails)
+        return label
+
+    def poll_thumbnails(self):
+        #Show thumbnails that finished loading. Runs on the Tk thread.
+        while True:
+            try:
+                label, future = self.thumbnail_results.get_nowait()
+            except queue.Empty:
+                break
+            self.thumbnails_pending -= 1
+            try:
+                if label.winfo_exists():
+                    photo = ImageTk.PhotoImage(future.result())
+                    label.config(image=photo)
+                    label.image = photo # Keep a reference to prevent garbage collection
+            except Exception as e:
+                print(f"Error loading thumbnail: {e}")
+        if self.thumbnails_pending:
+            self.root.after(50, self.poll_thumbnails)
+
+    def setup_pantry_tab(self):
+        #Set up the "What Can I Cook" tab.
+        #Ranks every meal in the local catalog by how many ingredients are missing.
+        Label(self.pantry_tab,
+              text="Enter the ingredients you have (comma separated)",
+              font=("Helvetica", 18, "bold"),
+              fg="white",
+              bg="#1e3c72").pack(pady=20)
+
+        self.pantry_entry = Entry(self.pantry_tab,
+                                  font=("Helvetica", 16),
+                                  width=40,
+                                  justify=CENTER)
+        self.pantry_entry.pack(pady=10)
+        self.pantry_entry.bind("<Return>", lambda e: self.rank_pantry_meals())
+
+        button_frame = Frame(self.pantry_tab, bg="#1e3c72")
+        button_frame.pack(pady=10)
+        self.create_button(button_frame,
+                          "Find Meals",
+                          self.rank_pantry_meals).pack(side=LEFT, padx=10)
+        self.create_button(button_frame,
+                          "Build Catalog",
+                          self.build_catalog).pack(side=LEFT, padx=10)
+
+        self.pantry_status = Label(self.pantry_tab,
+                                   text=f"{len(self.catalog)} meals in local catalog",
+                                   font=("Helvetica", 12),
+                                   fg="white",
+                                   bg="#1e3c72")
+        self.pantry_status.pack()
+
+        self.pantry_placeholder = Frame(self.pantry_tab,
+                                        bg="#1e3c72",
+                                        relief="groove",
+                                        bd=2)
+        self.pantry_placeholder.pack(fill=BOTH, expand=True, pady=10)
+
+    def build_catalog(self):
+        #Download full details for every meal into the local catalog on a background thread.
+        # search.php?f=<letter> returns the same payload as lookup.php,
+        # so 26 requests cover the whole catalog.
+        def work(progress):
+            changed = False
+            for letter in string.ascii_lowercase:
+                progress(f"Downloading meals starting with {letter.upper()}...")
+                data = self.client.get_json(f"{API_BASE}/search.php?f={letter}",
+                                            cache=False, priority=PRIORITY_PREFETCH)
+                for meal in data.get("meals") or []:
+                    changed = self.catalog.add(meal) or changed
+            if changed:
+                self.catalog.save()
+            progress(f"{len(self.catalog)} meals in local catalog")
+
+        self.pantry_status.config(text="Building catalog...")
+        self.run_cache_task(work, "Error building catalog", self.pantry_status)
+
+    def get_pantry_index(self):
+        #Return the pantry index, rebuilding it only when the catalog changed.
+        if self.pantry_index is None or self.pantry_index_version != self.catalog.version:
+            self.pantry_index = PantryIndex(list(self.catalog.snapshot().values()))
+            self.pantry_index_version = self.catalog.version
+        return self.pantry_index
+
+    def rank_pantry_meals(self):
+        #Rank every meal in the catalog against the user's ingredients.
+        ingredients = [i for i in self.pantry_entry.get().split(",") if i.strip()]
+        if not ingredients:
+            messagebox.showwarning("Input Required", "Please enter at least one ingredient.")
+            return
+        if not len(self.catalog):
+            messagebox.showinfo("Empty Catalog", "Press Build Catalog to download the meal catalog first.")
+            return
+
+        index = self.get_pantry_index()
+        start = time.perf_counter()
+        results = index.rank(ingredients, limit=50)
+        elapsed = (time.perf_counter() - start) * 1000
+        self.pantry_status.config(
+            text=f"Ranked {len(index.rows)} meals in {elapsed:.1f} ms")
+
+        # Clear existing results
+        for widget in self.pantry_placeholder.winfo_children():
+            widget.destroy()
+
+        canvas = Canvas(self.pantry_placeholder, bg="#1e3c72")
+        scrollbar = ttk.Scrollbar(self.pantry_placeholder, orient="vertical", command=canvas.yview)
+        scrollable_frame = Frame(canvas, bg="#1e3c72")
+
+        canvas.configure(yscrollcommand=scrollbar.set)
+        scrollable_frame.bind("<Configure>", lambda e: canvas.configure(scrollregion=canvas.bbox("all")))
+        canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
+
+        for missing_count, matched_count, meal, missing in results:
+            if missing_count:
+                missing_text = f"missing {missing_count}: {', '.join(index.missing_names(missing))}"
+            else:
+                missing_text = "you have everything!"
+            # Details come from the local catalog, no network needed
+            button = Button(scrollable_frame,
+                            text=f"{meal['strMeal']} ({missing_text})",
+                            font=("Helvetica", 12),
+                            bg="#4e8ccf",
+                            fg="white",
+                            anchor="w",
+                            wraplength=760,
+                            justify=LEFT,
+                            command=lambda m=meal: self.display_meal_details(m))
+            button.pack(fill=X, pady=3, padx=10)
+
+        scrollbar.pack(side=RIGHT, fill=Y)
+        canvas.pack(side=LEFT, fill=BOTH, expand=True)
+
+    def add_recent_meal(self, meal_data):
+        #Add a meal to the recently viewed list and pin it in the cache.
+        self.session_state.add_recent(meal_data["idMeal"])
+        self.client.pin_meals(self.session_state.recent)
+        self.session_state.save()
+        # Rebuilt when the Recent tab is shown, not on every meal view
+        self.recent_dirty = True
+        if self.recent_placeholder is not None and self.tab_control.select() == str(self.recent_tab):
+            self.refresh_recent_tab()
+
+    def setup_recent_tab(self):
+        #Set up the recently viewed meals tab.
+        Label(self.recent_tab,
+              text="Recently Viewed Meals",
+              font=("Helvetica", 18, "bold"),
+              fg="white",
+              bg="#1e3c72").pack(pady=20)
+
+        self.recent_placeholder = Frame(self.recent_tab,
+                                        bg="#1e3c72",
+                                        relief="groove",
+                                        bd=2)
+        self.recent_placeholder.pack(fill=BOTH, expand=True, pady=20)
+        self.refresh_recent_tab()
+
+    def on_tab_changed(self, event):
+        #Refresh the Recent tab when it is shown with stale contents.
+        if self.recent_dirty and self.tab_control.select() == str(self.recent_tab):
+            self.refresh_recent_tab()
+
+    def refresh_recent_tab(self):
+        #Show the recently viewed meals from the local catalog.
+        if self.recent_placeholder is None:
+            return
+        self.recent_dirty = False
+        for widget in self.recent_placeholder.winfo_children():
+            widget.destroy()
+
+        canvas = Canvas(self.recent_placeholder, bg="#1e3c72")
+        scrollbar = ttk.Scrollbar(self.recent_placeholder, orient="vertical", command=canvas.yview)
+        scrollable_frame = Frame(canvas, bg="#1e3c72")
+
+        canvas.configure(yscrollcommand=scrollbar.set)
+        scrollable_frame.bind("<Configure>", lambda e: canvas.configure(scrollregion=canvas.bbox("all")))
+        canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
+
+        for meal_id in self.session_state.recent:
+            meal = self.catalog.get(meal_id)
+            if meal is None:
+                continue
+            meal_frame = Frame(scrollable_frame, bg="#1e3c72")
+            meal_frame.pack(fill=X, pady=5, padx=10)
+
+            img_label = self.thumbnail_label(meal_frame, meal["strMealThumb"], (50, 50))
+            img_label.pack(side=LEFT, padx=5)
+
+            button = Button(meal_frame,
+                            text=meal["strMeal"],
+                            font=("Helvetica", 12),
+                            bg="#4e8ccf",
+                            fg="white",
+                            command=lambda m=meal: self.display_meal_details(m))
+            button.pack(side=LEFT, fill=X, expand=True, padx=5)
+
+        scrollbar.pack(side=RIGHT, fill=Y)
+        canvas.pack(side=LEFT, fill=BOTH, expand=True)
+
+    def track_window(self, window, description):
+        #Remember an open result window so the session can reopen it.
+        self.open_windows[window] = description
+        window.bind("<Destroy>",
+                    lambda e: self.open_windows.pop(window, None) if e.widget is window else None)
+
+    def save_session(self):
+        #Save the tab state and open windows for the next launch.
+        state = self.session_state
+        state.windows = list(self.open_windows.values())
+        if state.explored:
+            state.tabs = {"selected": self.tab_control.index("current"),
+                          "meal": self.meal_entry.get(),
+                          "ingredient": self.ingredient_entry.get(),
+                          "pantry": self.pantry_entry.get(),
+                          "last_ingredient": self.last_ingredient,
+                          "categories": self.categories_loaded,
+                          "areas": self.areas_loaded}
+        state.save()
+
+    def restore_session(self):
+        #Reopen the previous session using only the local cache.
+        #Anything that is not cached is skipped rather than fetched.
+        self.restoring = True
+        try:
+            self.reopen_session(self.session_state.tabs)
+        finally:
+            self.restoring = False
+
+    def reopen_session(self, tabs):
+        #Rebuild the tabs and windows saved in tabs. Called by restore_session.
+        self.start_exploration()
+        for entry, key in ((self.meal_entry, "meal"),
+                           (self.ingredient_entry, "ingredient"),
+                           (self.pantry_entry, "pantry")):
+            entry.insert(0, tabs.get(key) or "")
+
+        if tabs.get("last_ingredient"):
+            data = self.client.cached_json(f"{API_BASE}/filter.php?i={tabs['last_ingredient']}")
+            if data:
+                self.display_ingredient_meals(tabs["last_ingredient"], data)
+        if tabs.get("categories"):
+            data = self.client.cached_json(f"{API_BASE}/categories.php")
+            if data:
+                self.fetch_categories(data)
+        if tabs.get("areas"):
+            data = self.client.cached_json(f"{API_BASE}/list.php?a=list")
+            if data:
+                self.fetch_areas(data)
+
+        for window in self.session_state.windows:
+            if window.get("type") == "meal":
+                meal = self.catalog.get(window.get("id"))
+                if meal:
+                    self.display_meal_details(meal, record=False)
+            elif window.get("type") == "category":
+                data = self.client.cached_json(f"{API_BASE}/filter.php?c={window.get('name')}")
+                if data:
+                    self.fetch_meals_by_category(window["name"], data)
+            elif window.get("type") == "area":
+                data = self.client.cached_json(f"{API_BASE}/filter.php?a={window.get('name')}")
+                if data:
+                    self.display_area_meals(window["name"], data)
+
+        try:
+            self.tab_control.select(tabs.get("selected", 0))
+        except TclError:
+            pass
+
+    def setup_cache_tab(self):
+        #Set up the cache tab showing cache statistics and management actions.
+        Label(self.cache_tab,
+              text="Cache Statistics",
+              font=("Helvetica", 18, "bold"),
+              fg="white",
+              bg="#1e3c72").pack(pady=20)
+
+        self.cache_report = Text(self.cache_tab,
+                                 font=("Courier", 11),
+                                 bg="#16213E",
+                                 fg="white",
+                                 height=10,
+                                 width=90,
+                                 relief="groove",
+                                 bd=2)
+        self.cache_report.pack(pady=10)
+
+        # Category or area name for targeted warming and invalidation
+        self.cache_entry = Entry(self.cache_tab,
+                                 font=("Helvetica", 16),
+                                 width=30,
+                                 justify=CENTER)
+        self.cache_entry.pack(pady=10)
+
+        name_frame = Frame(self.cache_tab, bg="#1e3c72")
+        name_frame.pack(pady=5)
+        for text, command in (("Warm Category", lambda: self.warm_cache(categories=[self.cache_entry.get().strip()])),
+                              ("Warm Area", lambda: self.warm_cache(areas=[self.cache_entry.get().strip()])),
+                              ("Clear Category", lambda: self.invalidate_cache(category=self.cache_entry.get().strip())),
+                              ("Clear Area", lambda: self.invalidate_cache(area=self.cache_entry.get().strip()))):
+            self.create_button(name_frame, text, command).pack(side=LEFT, padx=5)
+
+        tier_frame = Frame(self.cache_tab, bg="#1e3c72")
+        tier_frame.pack(pady=5)
+        for text, command in (("Refresh", self.refresh_cache_report),
+                              ("Compact", self.compact_cache),
+                              ("Verify", self.verify_cache),
+                              ("Clear JSON", lambda: self.invalidate_cache(tier="json")),
+                              ("Clear Thumbnails", lambda: self.invalidate_cache(tier="thumbnails")),
+                              ("Sync Catalog", self.sync_catalog)):
+            self.create_button(tier_frame, text, command).pack(side=LEFT, padx=5)
+
+        self.cache_status = Label(self.cache_tab,
+                                  text="",
+                                  font=("Helvetica", 12),
+                                  fg="white",
+                                  bg="#1e3c72")
+        self.cache_status.pack(pady=10)
+        self.refresh_cache_report()
+
+    def refresh_cache_report(self):
+        #Show the latest cache statistics.
+        self.cache_report.delete("1.0", END)
+        self.cache_report.insert(END, format_cache_report(self.client.stats()))
+
+    def invalidate_cache(self, **kwargs):
+        #Remove cached entries for a category, area or whole tier.
+        if not any(kwargs.values()):
+            messagebox.showwarning("Input Required", "Please enter a category or area.")
+            return
+        removed = self.client.invalidate(**kwargs)
+        self.cache_status.config(text="Removed " + ", ".join(f"{n} {name}" for name, n in removed.items()))
+        self.refresh_cache_report()
+
+    def compact_cache(self):
+        #Compact the on-disk cache on a background thread.
+        def work(progress):
+            result = self.client.compact()
+            freed = sum(tier["bytes_freed"] for tier in result.values())
+            progress(f"Compacted cache, freed {freed / 1024:.1f} KiB")
+
+        self.cache_status.config(text="Compacting cache...")
+        self.run_cache_task(work, "Error compacting cache")
+
+    def verify_cache(self):
+        #Check the thumbnail pack checksums on a background thread.
+        self.cache_status.config(text="Verifying thumbnails...")
+        self.run_cache_task(lambda progress: progress(f"Dropped {self.client.verify()} broken thumbnails"),
+                            "Error verifying cache")
+
+    def warm_cache(self, categories=(), areas=()):
+        #Warm the cache for a category or area on a background thread.
+        if not any(categories) and not any(areas):
+            messagebox.showwarning("Input Required", "Please enter a category or area.")
+            return
+        self.cache_status.config(text="Warming cache...")
+        self.run_cache_task(lambda progress: self.client.warm(categories, areas, progress=progress),
+                            "Error warming cache")
+
+    def sync_catalog(self):
+        #Update the local catalog with new and removed meals on a background thread.
+        def work(progress):
+            report = self.client.sync_catalog(progress=progress)
+            progress(format_sync_report(report).splitlines()[0])
+
+        self.cache_status.config(text="Syncing catalog...")
+        self.run_cache_task(work, "Error syncing catalog")
+
+    def run_cache_task(self, work, error_text, status=None):
+        #Run work(progress) on a background thread, showing progress messages.
+        #status: label for the messages, the Cache tab status by default.
+        status = status or self.cache_status
+        messages = queue.Queue()
+
+        def worker():
+            try:
+                work(messages.put)
+            except Exception as e:
+                messages.put(f"{error_text}: {e}")
+            messages.put(None)
+
+        def poll():
+            # Show progress on the Tk thread until the worker is done
+            while True:
+                try:
+                    message = messages.get_nowait()
+                except queue.Empty:
+                    self.root.after(100, poll)
+                    return
+                if message is None:
+                    self.refresh_cache_report()
+                    return
+                status.config(text=message)
+
+        threading.Thread(target=worker, daemon=True).start()
+        poll()
+
+    def close(self):
+        #Save the session and cache statistics and close the application.
+        self.save_session()
+        self.thumbnail_pool.shutdown(wait=False, cancel_futures=True)
+        self.client.close()
+        self.root.destroy()
+
     def run(self):
         """Start the application."""
         self.root.mainloop()
+
+
+def cache_command(argv):
+    #Command line tool to inspect and manage the cache without opening the GUI.
+    #Usage: python FoodieFiesta.py cache {stats,invalidate,warm,compact,verify,sync} ...
+    parser = argparse.ArgumentParser(prog="FoodieFiesta.py cache",
+                                     description="Inspect and manage the Foodie Fiesta cache.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("stats", help="show hit/miss ratios, sizes and entry ages")
+    invalidate = commands.add_parser("invalidate", help="remove cached entries")
+    invalidate.add_argument("--endpoint", help="API endpoint, e.g. filter.php")
+    invalidate.add_argument("--category", help="meal category, e.g. Seafood")
+    invalidate.add_argument("--area", help="meal area, e.g. Italian")
+    invalidate.add_argument("--tier", choices=["json", "thumbnails", "details"], help="clear a whole tier")
+    warm = commands.add_parser("warm", help="download meal lists and thumbnails ahead of time")
+    warm.add_argument("--category", action="append", default=[], help="category to warm, or 'all'")
+    warm.add_argument("--area", action="append", default=[], help="area to warm, or 'all'")
+    commands.add_parser("compact", help="drop stale entries and orphan files")
+    commands.add_parser("verify", help="check cached thumbnails against their checksums")
+    commands.add_parser("sync", help="fetch new meals and drop removed ones from the catalog")
+    args = parser.parse_args(argv)
+
+    client = MealDBClient()
+    try:
+        if args.command == "stats":
+            print(format_cache_report(client.stats()))
+        elif args.command == "invalidate":
+            print(client.invalidate(endpoint=args.endpoint, category=args.category,
+                                    area=args.area, tier=args.tier))
+        elif args.command == "warm":
+            client.warm(args.category, args.area)
+        elif args.command == "compact":
+            print(client.compact())
+        elif args.command == "verify":
+            print(f"Dropped {client.verify()} broken thumbnails")
+        elif args.command == "sync":
+            print(format_sync_report(client.sync_catalog()))
+    except Exception as e:
+        print(f"Error: {e}")
+        return 1
+    finally:
+        client.close()
+    return 0
+
+
+class FixtureResponse:
+    # Minimal stand-in for a streamed requests.Response built from recorded bytes.
+
+    def __init__(self, url, content, status_code=200):
+        self.url = url
+        self.content = content
+        self.status_code = status_code
+        self.headers = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        pass
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} for {self.url}", response=self)
+
+    def iter_content(self, chunk_size=8192):
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start:start + chunk_size]
+
+
+class FixtureSession:
+    # Stand-in for requests.Session that replays recorded TheMealDB responses and
+    # images from a folder, counting every request. With record=True, missing
+    # fixtures are downloaded from the real API and saved.
+
+    def __init__(self, directory, record=False):
+        self.directory = directory
+        self.record = record
+        self.upstream = requests.Session() if record else None
+        self.index_path = os.path.join(directory, "index.json")
+        self.calls = 0
+        self.lock = threading.Lock()
+        try:
+            with open(self.index_path, encoding="utf-8") as f:
+                self.index = json.load(f)
+        except (OSError, ValueError):
+            self.index = {}
+
+    def get(self, url, stream=False, timeout=None):
+        with self.lock:
+            self.calls += 1
+            name = self.index.get(url)
+        if name is None:
+            if not self.record:
+                raise requests.ConnectionError(f"No recorded fixture for {url}")
+            response = self.upstream.get(url, timeout=timeout)
+            response.raise_for_status()
+            name = hashlib.sha1(url.encode("utf-8")).hexdigest()
+            with self.lock:
+                os.makedirs(self.directory, exist_ok=True)
+                with open(os.path.join(self.directory, name), "wb") as f:
+                    f.write(response.content)
+                self.index[url] = name
+                with open(self.index_path, "w", encoding="utf-8") as f:
+                    json.dump(self.index, f, indent=1, sort_keys=True)
+        with open(os.path.join(self.directory, name), "rb") as f:
+            return FixtureResponse(url, f.read())
+
+    def close(self):
+        if self.upstream is not None:
+            self.upstream.close()
+
+
+# Folder holding recorded API responses and images for the perf command
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "perf_fixtures")
+# Per-flow budgets for the perf command. Widget and HTTP budgets are exact:
+# a base count plus an allowance per row of each kind the flow shows, so one
+# extra widget or request per row fails. Area buttons and ingredient lines
+# make no requests. A cached ("warm") run must not touch the network.
+PERF_BUDGETS = {
+    "search": {"ms": 1500, "widgets": {"base": 13, "ingredient": 1}, "http": {"base": 2}},
+    "ingredient": {"ms": 3000, "widgets": {"base": 3, "meal": 3}, "http": {"base": 1, "meal": 1}},
+    "categories": {"ms": 3000, "widgets": {"base": 8, "category": 4, "meal": 3},
+                   "http": {"base": 2, "category": 1, "meal": 1}},
+    "areas": {"ms": 3000, "widgets": {"base": 8, "area": 1, "meal": 3}, "http": {"base": 2, "meal": 1}},
+    "detail": {"ms": 1500, "widgets": {"base": 13, "ingredient": 1}, "http": {"base": 2}},
+}
+# Peak resident memory allowed for the whole perf run
+PERF_MAX_RSS_MB = 300
+
+
+def peak_rss_mb():
+    #Return the peak resident memory of this process in MB, or None if unknown.
+    try:
+        import resource # Not available on Windows
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in KB elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class PerfHarness:
+    # Drives MealDBExplorer without a user through the main flows, replaying
+    # recorded fixtures, and checks results and per-flow budgets for wall time,
+    # widgets created, HTTP calls and peak memory. Each flow returns how many
+    # rows of each kind it showed. The fixtures give every list its own meals,
+    # so each thumbnail in a cold run is a real request.
+
+    def __init__(self, app, session):
+        self.app = app
+        self.session = session
+        self.widgets_created = 0
+        self.dialogs = []
+        self.results = []
+
+    def settle(self, timeout=30):
+        #Run the Tk event loop until no request or thumbnail is outstanding.
+        app = self.app
+        end = time.perf_counter() + timeout
+        while time.perf_counter() < end:
+            app.root.update()
+            if not app.thumbnails_pending and not any(p.busy or p.workers for p in app.pipelines):
+                return True
+            time.sleep(0.002)
+        return False
+
+    def toplevels(self):
+        return [w for w in self.app.root.winfo_children() if isinstance(w, Toplevel)]
+
+    def count_buttons(self, widget):
+        #Count Button widgets below widget.
+        return sum(isinstance(child, Button) + self.count_buttons(child)
+                   for child in widget.winfo_children())
+
+    def window_titled(self, title):
+        for window in self.toplevels():
+            if window.title() == title:
+                return window
+        return None
+
+    def ingredient_lines(self, meal):
+        #Count the ingredient lines a meal details window shows.
+        return sum(bool((meal.get(f"strIngredient{i}") or "").strip()) for i in range(1, 21))
+
+    def close_windows(self):
+        for window in self.toplevels():
+            window.destroy()
+        self.app.root.update()
+
+    def flow_search(self):
+        self.app.meal_entry.delete(0, END)
+        self.app.meal_entry.insert(0, "Arrabiata")
+        self.app.search_meal()
+        self.settle()
+        meals = self.app.client.cached_json(f"{API_BASE}/search.php?s=Arrabiata")["meals"]
+        assert self.window_titled(meals[0]["strMeal"]), "meal details window not shown"
+        return {"ingredient": self.ingredient_lines(meals[0])}
+
+    def flow_ingredient(self):
+        self.app.ingredient_entry.delete(0, END)
+        self.app.ingredient_entry.insert(0, "chicken_breast")
+        self.app.search_by_ingredient()
+        self.settle()
+        meals = self.app.client.cached_json(f"{API_BASE}/filter.php?i=chicken_breast")["meals"]
+        shown = self.count_buttons(self.app.ingredients_placeholder)
+        assert shown == len(meals), f"{shown} rows shown for {len(meals)} meals"
+        return {"meal": len(meals)}
+
+    def flow_categories(self):
+        self.app.fetch_categories()
+        self.settle()
+        categories = self.app.client.cached_json(f"{API_BASE}/categories.php")["categories"]
+        shown = self.count_buttons(self.app.categories_placeholder)
+        assert shown == len(categories), f"{shown} categories shown for {len(categories)}"
+        category = categories[0]["strCategory"]
+        self.app.fetch_meals_by_category(category)
+        self.settle()
+        meals = self.app.client.cached_json(f"{API_BASE}/filter.php?c={category}")["meals"]
+        window = self.window_titled(f"{category} Meals")
+        assert window and self.count_buttons(window) == len(meals), "category meals not shown"
+        self.detail_id = meals[0]["idMeal"]
+        return {"category": len(categories), "meal": len(meals)}
+
+    def flow_areas(self):
+        self.app.fetch_areas()
+        self.settle()
+        areas = self.app.client.cached_json(f"{API_BASE}/list.php?a=list")["meals"]
+        assert self.count_buttons(self.app.area_placeholder) == len(areas), "areas not shown"
+        area = areas[0]["strArea"]
+        self.app.show_area_meals(area)
+        self.settle()
+        meals = self.app.client.cached_json(f"{API_BASE}/filter.php?a={area}")["meals"]
+        window = self.window_titled(f"Meals from {area}")
+        assert window and self.count_buttons(window) == len(meals), "area meals not shown"
+        return {"area": len(areas), "meal": len(meals)}
+
+    def flow_detail(self):
+        self.app.fetch_and_display_meal(self.detail_id)
+        self.settle()
+        meal = self.app.catalog.get(self.detail_id)
+        assert meal and self.window_titled(meal["strMeal"]), "meal details window not shown"
+        return {"ingredient": self.ingredient_lines(meal)}
+
+    def run_flow(self, name, warm):
+        #Run one flow and check it against its budget.
+        budget = PERF_BUDGETS[name]
+        widgets_before = self.widgets_created
+        calls_before = self.session.calls
+        self.dialogs.clear()
+        start = time.perf_counter()
+        failures = []
+        rows = {}
+        try:
+            rows = getattr(self, f"flow_{name}")()
+        except Exception as e:
+            failures.append(f"error: {e}")
+        elapsed = (time.perf_counter() - start) * 1000
+        widgets = self.widgets_created - widgets_before
+        calls = self.session.calls - calls_before
+        rss = peak_rss_mb()
+
+        max_widgets = self.allowance(budget["widgets"], rows)
+        max_calls = 0 if warm else self.allowance(budget["http"], rows)
+        if elapsed > budget["ms"]:
+            failures.append(f"took {elapsed:.0f} ms (budget {budget['ms']})")
+        if widgets > max_widgets:
+            failures.append(f"created {widgets} widgets (budget {max_widgets})")
+        if calls > max_calls:
+            failures.append(f"made {calls} HTTP calls (budget {max_calls})")
+        if rss is not None and rss > PERF_MAX_RSS_MB:
+            failures.append(f"peak RSS {rss:.0f} MB (budget {PERF_MAX_RSS_MB})")
+        failures += [f"dialog: {message}" for message in self.dialogs]
+        self.results.append((name, "warm" if warm else "cold", elapsed, widgets, calls, rss, failures))
+        self.close_windows()
+
+    def allowance(self, budget, rows):
+        #Return a budget's base plus its allowance for each row shown.
+        return budget["base"] + sum(budget.get(kind, 0) * count for kind, count in rows.items())
+
+    def run(self):
+        #Run every flow cold, then again with the cache warm. Returns True if all passed.
+        original_init = BaseWidget.__init__
+        originals = {name: getattr(messagebox, name) for name in ("showerror", "showwarning", "showinfo")}
+
+        def counting_init(widget, *args, **kwargs):
+            self.widgets_created += 1
+            original_init(widget, *args, **kwargs)
+
+        def record_dialog(title=None, message=None, **options):
+            # A dialog would block a headless run, so it is recorded as a failure
+            self.dialogs.append(f"{title}: {message}")
+
+        BaseWidget.__init__ = counting_init
+        for name in originals:
+            setattr(messagebox, name, record_dialog)
+        try:
+            self.app.start_exploration()
+            for warm in (False, True):
+                for name in PERF_BUDGETS:
+                    self.run_flow(name, warm)
+        finally:
+            BaseWidget.__init__ = original_init
+            for name, function in originals.items():
+                setattr(messagebox, name, function)
+        return all(not result[-1] for result in self.results)
+
+    def report(self):
+        lines = [f"{'flow':<12}{'cache':<7}{'ms':>8}{'widgets':>9}{'http':>6}{'rss MB':>8}  result"]
+        for name, cache, elapsed, widgets, calls, rss, failures in self.results:
+            rss_text = f"{rss:.0f}" if rss is not None else "n/a"
+            lines.append(f"{name:<12}{cache:<7}{elapsed:>8.0f}{widgets:>9}{calls:>6}{rss_text:>8}  "
+                         + ("; ".join(failures) if failures else "ok"))
+        return "\n".join(lines)
+
+
+def perf_command(argv):
+    #Run the main flows against recorded fixtures and check performance budgets.
+    #Usage: python FoodieFiesta.py perf [--fixtures DIR] [--record]
+    parser = argparse.ArgumentParser(prog="FoodieFiesta.py perf",
+                                     description="Replay recorded API fixtures through the main "
+                                                 "flows and check per-flow budgets.")
+    parser.add_argument("--fixtures", default=FIXTURE_DIR, help="folder of recorded responses")
+    parser.add_argument("--record", action="store_true",
+                        help="download missing fixtures from TheMealDB while running")
+    args = parser.parse_args(argv)
+
+    import shutil
+    import tempfile
+    # The welcome screen loads its background image from the current folder
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    cache_dir = tempfile.mkdtemp(prefix="foodie-perf-")
+    session = FixtureSession(args.fixtures, record=args.record)
+    client = MealDBClient(cache_dir, session=session, daemon=None)
+    app = MealDBExplorer(client)
+    app.root.withdraw()
+    try:
+        harness = PerfHarness(app, session)
+        passed = harness.run()
+        print(harness.report())
+    finally:
+        app.thumbnail_pool.shutdown(wait=False, cancel_futures=True)
+        client.close()
+        app.root.destroy()
+        shutil.rmtree(cache_dir, ignore_errors=True)
+    return 0 if passed else 1
+
+
+class CacheDaemon:
+    # Shared caching proxy for several app instances on one host or LAN.
+    # Instances ask it for TheMealDB URLs instead of going upstream. Responses
+    # and original images live in one shared disk cache, identical requests
+    # that arrive together share a single upstream download, and the
+    # thumbnails of every list served are prefetched in the background, so
+    # upstream traffic follows unique content rather than instance count.
+
+    def __init__(self, cache_dir, prefetch_limit=200):
+        # Upstream requests go through the daemon's own rate-limited scheduler
+        self.client = MealDBClient(cache_dir, daemon=None)
+        self.image_cache = DiskCache(os.path.join(cache_dir, "images"))
+        self.prefetch_limit = prefetch_limit
+        self.prefetch_pool = ThreadPoolExecutor(max_workers=4)
+        self.inflight = {} # url -> Future shared by coalesced requests
+        self.lock = threading.Lock()
+        self.served = 0
+        self.coalesced = 0
+
+    def fetch(self, url, priority=PRIORITY_USER):
+        #Return the body of a TheMealDB URL from the shared cache or upstream.
+        is_json = "/api/" in url
+        cacheable = not url.endswith("random.php")
+        cache = self.client.json_cache if is_json else self.image_cache
+        with self.lock:
+            self.served += 1
+        if cacheable:
+            data = cache.get(url, JSON_CACHE_TTL if is_json else None)
+            if data is not None:
+                return data
+
+        with self.lock:
+            future = self.inflight.get(url) if cacheable else None
+            leader = future is None
+            if leader:
+                future = Future()
+                if cacheable:
+                    self.inflight[url] = future
+            else:
+                self.coalesced += 1
+        if leader:
+            try:
+                data = self.client.scheduler.request(url, priority)
+                if cacheable:
+                    cache.put(url, data)
+                future.set_result(data)
+            except Exception as e:
+                future.set_exception(e)
+            finally:
+                with self.lock:
+                    self.inflight.pop(url, None)
+            if is_json and future.exception() is None:
+                self.prefetch_images(future.result())
+        return future.result()
+
+    def prefetch_images(self, data):
+        #Fetch the thumbnails listed in a JSON response ahead of the instances.
+        try:
+            payload = json.loads(data)
+        except ValueError:
+            return
+        urls = []
+        for items in payload.values():
+            for item in items if isinstance(items, list) else []:
+                for field in ("strMealThumb", "strCategoryThumb"):
+                    url = item.get(field) if isinstance(item, dict) else None
+                    if url and url.startswith(DAEMON_UPSTREAM):
+                        urls.append(url)
+        cached = set(self.image_cache.keys())
+        with self.lock:
+            inflight = set(self.inflight)
+        for url in urls[:self.prefetch_limit]:
+            if url not in cached and url not in inflight:
+                self.prefetch_pool.submit(self.fetch, url, PRIORITY_PREFETCH)
+
+    def stats(self):
+        with self.lock:
+            return {"served": self.served,
+                    "coalesced": self.coalesced,
+                    "upstream_requests": self.client.scheduler.requests_sent,
+                    "json": self.client.json_cache.stats(),
+                    "images": self.image_cache.stats()}
+
+
+class CacheDaemonHandler(BaseHTTPRequestHandler):
+    # HTTP front end of the CacheDaemon:
+    #   GET /health             -> "ok"
+    #   GET /stats              -> JSON statistics
+    #   GET /fetch?url=<url>    -> body of a TheMealDB URL (optional &priority=)
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        query = parse_qs(parsed.query)
+        if parsed.path == "/health":
+            self.reply(200, b"ok", "text/plain")
+        elif parsed.path == "/stats":
+            self.reply(200, json.dumps(self.server.cache_daemon.stats()).encode("utf-8"), "application/json")
+        elif parsed.path == "/fetch":
+            url = query.get("url", [""])[0]
+            if not url.startswith(DAEMON_UPSTREAM):
+                self.reply(403, b"only TheMealDB URLs are proxied", "text/plain")
+                return
+            try:
+                priority = int(query.get("priority", [PRIORITY_USER])[0])
+            except ValueError:
+                self.reply(400, b"priority must be an integer", "text/plain")
+                return
+            try:
+                data = self.server.cache_daemon.fetch(url, priority)
+            except requests.HTTPError as e:
+                # Pass upstream errors such as 404 or 429 through to the instance
+                status = e.response.status_code if e.response is not None else 502
+                self.reply(status, str(e).encode("utf-8"), "text/plain")
+                return
+            except Exception as e:
+                self.reply(502, str(e).encode("utf-8"), "text/plain")
+                return
+            content_type = ("application/json" if "/api/" in url
+                            else mimetypes.guess_type(url)[0] or "application/octet-stream")
+            self.reply(200, data, content_type)
+        else:
+            self.reply(404, b"not found", "text/plain")
+
+    def reply(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Keep the console quiet, one line per request is too noisy
+        pass
+
+
+def daemon_command(argv):
+    #Run the shared cache daemon until interrupted.
+    #Usage: python FoodieFiesta.py daemon [--host HOST] [--port PORT] [--cache-dir DIR]
+    parser = argparse.ArgumentParser(prog="FoodieFiesta.py daemon",
+                                     description="Shared TheMealDB cache for several app instances.")
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="address to listen on, e.g. 0.0.0.0 to serve the LAN")
+    parser.add_argument("--port", type=int, default=8765, help="port to listen on")
+    parser.add_argument("--cache-dir", default=os.path.join(CACHE_DIR, "shared"),
+                        help="folder for the shared cache")
+    args = parser.parse_args(argv)
+
+    daemon = CacheDaemon(args.cache_dir)
+    server = ThreadingHTTPServer((args.host, args.port), CacheDaemonHandler)
+    server.daemon_threads = True
+    server.cache_daemon = daemon
+    print(f"Cache daemon listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        daemon.prefetch_pool.shutdown(wait=False, cancel_futures=True)
+        daemon.client.close()
+        print(json.dumps(daemon.stats(), indent=1))
+    return 0
+
+
 # Entry point of the application.
 if __name__ == "__main__":
+    # Command line tools run without opening the GUI
+    if len(sys.argv) > 1 and sys.argv[1] == "cache":
+        sys.exit(cache_command(sys.argv[2:]))
+    if len(sys.argv) > 1 and sys.argv[1] == "perf":
+        sys.exit(perf_command(sys.argv[2:]))
+    if len(sys.argv) > 1 and sys.argv[1] == "daemon":
+        sys.exit(daemon_command(sys.argv[2:]))
     # Create an instance of the application.
     app = MealDBExplorer()
     # Run the application.
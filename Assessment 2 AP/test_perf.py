@@ -0,0 +1,27 @@
+# Runs the "perf" command flows against the bundled fixtures in perf_fixtures/.
+# Tk needs a display, so the test is skipped where none is available;
+# on a headless machine run it under Xvfb, e.g. xvfb-run python -m pytest
+import os
+import sys
+import tkinter
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import FoodieFiesta
+
+
+def display_available():
+    #Return True if a Tk window can be created here.
+    try:
+        tkinter.Tk().destroy()
+    except tkinter.TclError:
+        return False
+    return True
+
+
+@pytest.mark.skipif(not display_available(), reason="Tk needs a display (try xvfb-run)")
+def test_main_flows_within_budgets(capsys):
+    # perf_command prints the per-flow report and returns 1 on any failure
+    status = FoodieFiesta.perf_command([])
+    assert status == 0, capsys.readouterr().out